@@ -10,8 +10,8 @@ import json
 import logging
 
 from ..core.base_agent import BaseAgent
-from ..integrations.blockchain_explorer import BlockchainExplorerClient
-from ..integrations.coingecko import CoinGeckoClient
+from ..integrations.blockchain_explorer import BlockchainExplorerClient, blockchain_explorer
+from ..integrations.coingecko import get_coingecko_client
 from ..utils.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -23,12 +23,18 @@ class OnchainAgent(BaseAgent):
     Fornece análises detalhadas sobre tokens, holders, transações e métricas on-chain.
     """
     
-    def __init__(self):
-        """Inicializa o OnchainAgent com clientes de blockchain e APIs."""
+    def __init__(self, explorer: Optional[BlockchainExplorerClient] = None):
+        """
+        Inicializa o OnchainAgent com clientes de blockchain e APIs.
+        
+        Args:
+            explorer: Cliente dos exploradores (opcional; por padrão a instância do módulo,
+                que compartilha pool HTTP e caches e é fechada no encerramento da aplicação)
+        """
         super().__init__()
-        self.name = "onchain_agent"
-        self.blockchain_explorer = BlockchainExplorerClient()
-        self.coingecko = CoinGeckoClient()
+        self.name = "OnchainAgent"  # Nome usado pelas rotas e perfis do AgentManager
+        self.blockchain_explorer = explorer or blockchain_explorer
+        self.coingecko = get_coingecko_client()
         self.description = "Agente responsável por analisar dados on-chain de contratos inteligentes em diferentes blockchains."
         logger.info("OnchainAgent inicializado com sucesso")
         
@@ -59,18 +65,16 @@ class OnchainAgent(BaseAgent):
                 
             logger.info(f"Iniciando análise do token {address} na chain {chain}")
                 
-            # Obter informações do contrato
-            contract_info = await self.blockchain_explorer.get_address_info(address, chain)
+            # Obter informações do contrato, holders e transações recentes em paralelo
+            overview = await self.blockchain_explorer.get_token_overview(address, chain)
+            contract_info = overview["info"]
             
             if contract_info.get("error"):
                 logger.error(f"Erro ao obter informações do contrato: {contract_info['error']}")
                 return {"error": contract_info['error']}
                 
-            # Obter holders do token
-            holders_info = await self.blockchain_explorer.get_token_holders(address, chain)
-            
-            # Obter transações recentes do token
-            transactions = await self.blockchain_explorer.get_token_transactions(address, chain)
+            holders_info = overview["holders"]
+            transactions = overview["transactions"]
             
             # Obter dados do mercado (CoinGecko)
             market_data = await self._get_market_data(address, chain)
@@ -363,6 +367,18 @@ class OnchainAgent(BaseAgent):
         """
         Valida os dados de entrada para análise onchain.
         
+        Args:
+            token_data: Dados do token para validação
+            
+        Returns:
+            bool: True se os dados são válidos, False caso contrário
+        """
+        return self.validate_input_sync(token_data)
+        
+    def validate_input_sync(self, token_data: Dict[str, Any]) -> bool:
+        """
+        Valida os dados de entrada para análise onchain sem I/O.
+        
         Args:
             token_data: Dados do token para validação
             
@@ -36,6 +36,18 @@ class SentimentAgent(BaseAgent):
         """
         Valida os dados de entrada para análise de sentimento.
         
+        Args:
+            data: Dados de entrada contendo ao menos o símbolo do token.
+            
+        Returns:
+            True se os dados forem válidos, False caso contrário.
+        """
+        return self.validate_input_sync(data)
+        
+    def validate_input_sync(self, data: Dict[str, Any]) -> bool:
+        """
+        Valida os dados de entrada para análise de sentimento sem I/O.
+        
         Args:
             data: Dados de entrada contendo ao menos o símbolo do token.
             
@@ -133,8 +145,8 @@ class SentimentAgent(BaseAgent):
         
         # Buscar dados de notícias de criptomoedas via CoinGecko
         try:
-            from ..integrations.coingecko import coingecko_client
-            news_data = await coingecko_client.get_coin_news(symbol.lower())
+            from ..integrations.coingecko import get_coingecko_client
+            news_data = await get_coingecko_client().get_coin_news(symbol.lower())
             news_texts = [f"{item.get('title', '')}: {item.get('description', '')}" for item in news_data if item.get('title')]
         except Exception as e:
             logger.warning(f"Erro ao obter notícias do CoinGecko: {str(e)}")
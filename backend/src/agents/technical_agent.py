@@ -9,7 +9,7 @@ from loguru import logger
 
 from ..core.base_agent import BaseAgent
 from ..integrations.cryptocompare import cryptocompare_client
-from ..integrations.coingecko import coingecko_client
+from ..integrations.coingecko import get_coingecko_client
 
 class TechnicalAgent(BaseAgent):
     """Agente para análise técnica de tokens usando APIs gratuitas"""
@@ -126,7 +126,7 @@ class TechnicalAgent(BaseAgent):
             if not data or len(data) < 30:
                 # Se falhar, tenta usar CoinGecko (gratuito com rate limiting)
                 logger.info("Alternando para CoinGecko")
-                data = await coingecko_client.get_token_history(symbol, days=100)
+                data = await get_coingecko_client().get_token_history(symbol, days=100)
             
             if not data or len(data) < 30:
                 logger.error(f"Não foi possível obter dados históricos para {symbol}")
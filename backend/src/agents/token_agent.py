@@ -5,7 +5,7 @@ import re
 from urllib.parse import urlparse
 
 from ..core.base_agent import BaseAgent
-from ..integrations.coingecko import CoinGeckoClient
+from ..integrations.coingecko import get_coingecko_client
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,7 @@ class TokenAgent(BaseAgent):
         Inicializa o agente de token.
         """
         super().__init__()
-        self.coingecko = CoinGeckoClient()
+        self.coingecko = get_coingecko_client()
         self.name = "TokenAgent"  # Nome para registro no AgentManager
         self.description = "Agente responsável por obter e analisar informações de tokens"
         logger.info("TokenAgent inicializado")
@@ -83,9 +83,11 @@ class TokenAgent(BaseAgent):
                     "error": f"Erro ao buscar informações do token: {token_info.get('error', 'Token não encontrado')}"
                 }
                 
-            # Obter dados de mercado
+            # Obter dados de mercado (reaproveita os que já vieram em coins/{id})
             token_id = token_info.get("id")
-            market_data = await self.coingecko.get_coin_market_data(token_id)
+            market_data = token_info.get("market_data")
+            if not market_data:
+                market_data = await self.coingecko.get_coin_market_data(token_id)
             
             # Construir resposta
             result = {
@@ -215,6 +217,18 @@ class TokenAgent(BaseAgent):
         """
         Valida os dados de entrada do token.
         
+        Args:
+            token_data: Dados do token para validação
+            
+        Returns:
+            bool: True se os dados são válidos, False caso contrário
+        """
+        return self.validate_input_sync(token_data)
+        
+    def validate_input_sync(self, token_data: Dict[str, Any]) -> bool:
+        """
+        Valida os dados de entrada do token sem I/O.
+        
         Args:
             token_data: Dados do token para validação
             
@@ -7,15 +7,9 @@ from loguru import logger
 
 from ...models.onchain import OnchainRequest, OnchainResponse
 from ...core.agent_manager import agent_manager
-from ...agents.onchain_agent import OnchainAgent
-from ...db.database import Database
+from ...db.database import db
 
 router = APIRouter()
-db = Database()
-
-# Registrar o agente de análise onchain
-onchain_agent = OnchainAgent()
-agent_manager.register_agent(onchain_agent)
 
 @router.post("/", response_model=OnchainResponse)
 async def analyze_token_onchain(request: OnchainRequest):
@@ -6,12 +6,10 @@ import random
 from loguru import logger
 
 from ...core.agent_manager import agent_manager
-from ...agents.sentiment_agent import SentimentAgent
 from ...integrations.supabase import supabase
-from ...db.database import Database
+from ...db.database import db
 
 router = APIRouter()
-db = Database()
 
 class SentimentAnalysisRequest(BaseModel):
     symbol: str
@@ -26,10 +24,6 @@ class SentimentAnalysisResponse(BaseModel):
     discussion_trends: List[str]
     timestamp: str
 
-# Registrar o agente de sentimento
-sentiment_agent = SentimentAgent()
-agent_manager.register_agent(sentiment_agent)
-
 @router.post("/", response_model=SentimentAnalysisResponse)
 async def analyze_token_sentiment(request: SentimentAnalysisRequest):
     """
@@ -1,16 +1,70 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Hashable
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from datetime import datetime
+import asyncio
+import hashlib
 import uuid
 from loguru import logger
 
 from ...core.agent_manager import agent_manager
 from ...agents.token_agent import TokenAgent
-from ...db.database import Database
+from ...db.database import db
 
 router = APIRouter()
-db = Database()
+
+# Análises em andamento, indexadas pelo identificador do token
+_inflight: Dict[Hashable, asyncio.Task] = {}
+
+async def _run_coalesced(key: Hashable, factory: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Executa a análise uma única vez por chave, mesmo com requisições concorrentes.
+    
+    Requisições simultâneas para o mesmo token aguardam a mesma tarefa em vez de
+    disparar novas chamadas ao CoinGecko.
+    
+    Args:
+        key: Identificador da análise (token e agentes)
+        factory: Função que cria a corrotina de análise
+        
+    Returns:
+        Dict[str, Any]: Resultado compartilhado da análise
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: o cancelamento de um cliente não cancela a análise dos demais
+    return await asyncio.shield(task)
+
+async def _save_and_log(analysis_data: Dict[str, Any]) -> None:
+    """
+    Salva a análise no banco fora do caminho da resposta, apenas registrando falhas.
+    
+    Args:
+        analysis_data: Dados da análise a serem salvos
+    """
+    try:
+        result = await db.save_analysis(analysis_data)
+        if "error" in result:
+            logger.error("Erro ao salvar análise no banco: {}", result['error'])
+    except Exception as e:
+        logger.error("Erro ao acessar banco de dados: {}", e)
+
+# Cabeçalhos de cache das consultas de análises
+_ANALYSIS_CACHE_CONTROL = "public, max-age=3600"
+_USER_ANALYSES_CACHE_CONTROL = "private, max-age=30"
+
+# Dados estáticos do Bitcoin usados quando a análise falha
+_BTC_FALLBACK: Dict[str, Any] = {
+    "symbol": "BTC",
+    "name": "Bitcoin",
+    "price": {
+        "current": 65000,
+        "change_24h": 2.5
+    }
+}
 
 # Endpoint simples e direto para Bitcoin
 @router.get("/btc", response_model=Dict[str, Any])
@@ -19,52 +73,34 @@ async def btc_simple():
     Análise simples do Bitcoin sem usar o agente
     """
     try:
-        # Criar instância do TokenAgent
-        direct_token_agent = TokenAgent()
-        
         # Configurar dados para análise usando a URL oficial do Bitcoin no CoinGecko
         token_data = {
             "url": "https://www.coingecko.com/en/coins/bitcoin",
             "symbol": "BTC"
         }
         
-        # Executar análise
-        token_result = await direct_token_agent.analyze(token_data)
+        # Executar análise (compartilhada entre requisições simultâneas)
+        token_result = await _run_coalesced(
+            ("btc_simple",),
+            lambda: TokenAgent().analyze(token_data)
+        )
         
         if "error" in token_result:
             # Fallback para dados estáticos se a análise falhar
-            return {
-                "analysis_id": str(uuid.uuid4()),
-                "symbol": "BTC",
-                "name": "Bitcoin",
-                "price": {
-                    "current": 65000,
-                    "change_24h": 2.5
-                },
-                "timestamp": datetime.now().isoformat()
-            }
+            return {**_BTC_FALLBACK, "analysis_id": str(uuid.uuid4()), "timestamp": datetime.now().isoformat()}
         
         # Simplificar os dados retornados
         return {
             "analysis_id": str(uuid.uuid4()),
             "symbol": token_result.get("symbol", "BTC"),
             "name": token_result.get("name", "Bitcoin"),
-            "price": token_result.get("price", {"current": 65000, "change_24h": 2.5}),
+            "price": token_result.get("price", _BTC_FALLBACK["price"]),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         # Em caso de erro, retornar dados estáticos
-        logger.error(f"Erro ao analisar BTC: {str(e)}")
-        return {
-            "analysis_id": str(uuid.uuid4()),
-            "symbol": "BTC",
-            "name": "Bitcoin",
-            "price": {
-                "current": 65000,
-                "change_24h": 2.5
-            },
-            "timestamp": datetime.now().isoformat()
-        }
+        logger.error("Erro ao analisar BTC: {}", e)
+        return {**_BTC_FALLBACK, "analysis_id": str(uuid.uuid4()), "timestamp": datetime.now().isoformat()}
 
 class TokenAnalysisRequest(BaseModel):
     symbol: Optional[str] = None
@@ -75,6 +111,13 @@ class TokenAnalysisRequest(BaseModel):
     include_sentiment: bool = False
     include_onchain: bool = False
     
+    @model_validator(mode="after")
+    def check_identifier(self) -> "TokenAnalysisRequest":
+        """Exige pelo menos um identificador do token."""
+        if not self.symbol and not self.url and not self.address:
+            raise ValueError("É necessário fornecer pelo menos um: símbolo, URL ou endereço do token")
+        return self
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -97,29 +140,21 @@ class TokenAnalysisResponse(BaseModel):
     additional_info: Optional[Dict[str, Any]] = None
     timestamp: str
 
-# Registrar o agente de token
-token_agent = TokenAgent()
-agent_manager.register_agent(token_agent)
+_analysis_list_adapter = TypeAdapter(List[TokenAnalysisResponse])
 
 @router.post("/", response_model=TokenAnalysisResponse)
-async def analyze_token(request: TokenAnalysisRequest):
+async def analyze_token(request: TokenAnalysisRequest, http_request: Request):
     """
     Realiza análise completa de um token.
     
     Args:
         request: Dados do token para análise
+        http_request: Requisição HTTP (acesso ao estado da aplicação)
         
     Returns:
         TokenAnalysisResponse: Resultado da análise do token
     """
     try:
-        # Verificar se pelo menos um identificador foi fornecido
-        if not request.symbol and not request.url and not request.address:
-            raise HTTPException(
-                status_code=400,
-                detail="É necessário fornecer pelo menos um: símbolo, URL ou endereço do token"
-            )
-
         # Configurar quais agentes executar
         agent_names = ["TokenAgent"]
         
@@ -137,10 +172,11 @@ async def analyze_token(request: TokenAnalysisRequest):
             "chain": request.chain
         }
         
-        # Executar análise
-        analysis_result = await agent_manager.run_analysis(
-            token_data=token_data,
-            agent_names=agent_names
+        # Executar análise (compartilhada entre requisições simultâneas)
+        key = (request.symbol or request.url or request.address, request.chain, tuple(agent_names))
+        analysis_result = await _run_coalesced(
+            key,
+            lambda: agent_manager.run_profile(frozenset(agent_names), token_data)
         )
         
         token_result = analysis_result.get("TokenAgent", {})
@@ -148,7 +184,7 @@ async def analyze_token(request: TokenAnalysisRequest):
         onchain_result = analysis_result.get("OnchainAgent", {})
         
         if "error" in token_result:
-            logger.error(f"Erro na análise de token: {token_result['error']}")
+            logger.error("Erro na análise de token: {}", token_result['error'])
             raise HTTPException(
                 status_code=500, 
                 detail=f"Erro ao realizar análise de token: {token_result['error']}"
@@ -175,15 +211,15 @@ async def analyze_token(request: TokenAnalysisRequest):
             "timestamp": timestamp
         }
         
-        # Tenta salvar análise no banco - permite continuar mesmo se falhar
-        try:
-            result = await db.save_analysis(analysis_data)
-            if "error" in result:
-                logger.error(f"Erro ao salvar análise no banco: {result['error']}")
-            else:
-                analysis_id = result.get("id", analysis_id)
-        except Exception as e:
-            logger.error(f"Erro ao acessar banco de dados: {str(e)}")
+        # Salva em segundo plano - o ID já foi gerado, a resposta não depende do banco.
+        # Sem o conjunto criado pelo lifespan (ex.: TestClient fora do `with`), salva antes de responder.
+        background_tasks = getattr(http_request.app.state, "background_tasks", None)
+        if background_tasks is None:
+            await _save_and_log(analysis_data)
+        else:
+            task = asyncio.create_task(_save_and_log(analysis_data))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
         
         # Retorna resposta formatada
         return TokenAnalysisResponse(
@@ -202,7 +238,7 @@ async def analyze_token(request: TokenAnalysisRequest):
         # Propagar exceções HTTP
         raise he
     except Exception as e:
-        logger.error(f"Erro ao realizar análise de token: {str(e)}")
+        logger.error("Erro ao realizar análise de token: {}", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao realizar análise de token: {str(e)}"
@@ -240,7 +276,7 @@ async def analyze_bitcoin_special():
         token_result = await direct_token_agent.analyze(token_data)
         
         if "error" in token_result:
-            logger.error(f"Erro na análise de BTC: {token_result['error']}")
+            logger.error("Erro na análise de BTC: {}", token_result['error'])
             raise HTTPException(
                 status_code=500, 
                 detail=f"Erro ao realizar análise de BTC: {token_result['error']}"
@@ -269,19 +305,23 @@ async def analyze_bitcoin_special():
         # Propagar exceções HTTP
         raise he
     except Exception as e:
-        logger.error(f"Erro ao realizar análise de BTC: {str(e)}")
+        logger.error("Erro ao realizar análise de BTC: {}", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao realizar análise de BTC: {str(e)}"
         )
 
 @router.get("/{analysis_id}", response_model=TokenAnalysisResponse)
-async def get_token_analysis(analysis_id: str):
+async def get_token_analysis(analysis_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Obtém uma análise de token específica pelo ID.
     
+    A ETag é um hash da representação enviada, então ela muda se a linha (ou a
+    forma como ela é achatada) mudar; o 304 só é devolvido para análises existentes.
+    
     Args:
         analysis_id: ID da análise
+        if_none_match: Cabeçalho If-None-Match enviado pelo cliente
         
     Returns:
         TokenAnalysisResponse: Resultado da análise de token
@@ -302,20 +342,14 @@ async def get_token_analysis(analysis_id: str):
                 detail="A análise solicitada não é do tipo token"
             )
         
-        # Extrair os dados do resultado
-        result = analysis.get("result", {})
+        # A linha já vem achatada do banco; serializada uma vez, para a ETag e o corpo
+        body = TokenAnalysisResponse.model_validate(analysis).model_dump_json().encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": _ANALYSIS_CACHE_CONTROL}
+        if if_none_match and etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
         
-        return TokenAnalysisResponse(
-            analysis_id=analysis.get("id"),
-            symbol=analysis.get("symbol"),
-            name=result.get("name"),
-            price=result.get("price"),
-            market_data=result.get("market_data"),
-            sentiment=result.get("sentiment"),
-            onchain=result.get("onchain"),
-            additional_info=result.get("additional_info"),
-            timestamp=analysis.get("timestamp", analysis.get("created_at"))
-        )
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except HTTPException as he:
         raise he
@@ -326,12 +360,13 @@ async def get_token_analysis(analysis_id: str):
         )
 
 @router.get("/user/{user_id}", response_model=List[TokenAnalysisResponse])
-async def get_user_token_analyses(user_id: str, limit: int = 10):
+async def get_user_token_analyses(user_id: str, response: Response, limit: int = 10):
     """
     Obtém análises de token de um usuário.
     
     Args:
         user_id: ID do usuário
+        response: Resposta, usada para definir os cabeçalhos de cache
         limit: Número máximo de análises a retornar
         
     Returns:
@@ -347,24 +382,16 @@ async def get_user_token_analyses(user_id: str, limit: int = 10):
                 detail=f"Erro ao buscar análises do usuário: {analyses['error']}"
             )
         
+        # A lista muda a cada nova análise: cache curto e por credencial
+        response.headers["Cache-Control"] = _USER_ANALYSES_CACHE_CONTROL
+        response.headers["Vary"] = "Authorization"
+        
         # Se a lista estiver vazia, retorna uma lista vazia
         if not analyses:
             return []
         
-        return [
-            TokenAnalysisResponse(
-                analysis_id=analysis.get("id"),
-                symbol=analysis.get("symbol"),
-                name=analysis.get("result", {}).get("name"),
-                price=analysis.get("result", {}).get("price"),
-                market_data=analysis.get("result", {}).get("market_data"),
-                sentiment=analysis.get("result", {}).get("sentiment"),
-                onchain=analysis.get("result", {}).get("onchain"),
-                additional_info=analysis.get("result", {}).get("additional_info"),
-                timestamp=analysis.get("timestamp", analysis.get("created_at"))
-            )
-            for analysis in analyses
-        ]
+        # As linhas já vêm achatadas do banco; valida a lista numa única passada
+        return _analysis_list_adapter.validate_python(analyses)
         
     except HTTPException as he:
         raise he
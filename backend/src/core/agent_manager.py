@@ -1,4 +1,5 @@
-from typing import Dict, List, Any, Type
+from typing import Dict, List, Any, Type, FrozenSet, Iterable, Tuple
+from loguru import logger
 from .base_agent import BaseAgent
 
 class AgentManager:
@@ -6,6 +7,7 @@ class AgentManager:
     
     def __init__(self):
         self.agents: Dict[str, BaseAgent] = {}
+        self._profiles: Dict[FrozenSet[str], Tuple[BaseAgent, ...]] = {}
     
     def register_agent(self, agent: BaseAgent) -> None:
         """
@@ -15,6 +17,29 @@ class AgentManager:
             agent: Instância do agente a ser registrado
         """
         self.agents[agent.name] = agent
+        # Perfis pré-computados podem ter ficado desatualizados
+        self._profiles.clear()
+    
+    def register_profile(self, agent_names: Iterable[str]) -> FrozenSet[str]:
+        """
+        Pré-computa a tupla de agentes para um conjunto de nomes.
+        
+        Args:
+            agent_names: Nomes dos agentes do perfil
+            
+        Returns:
+            FrozenSet[str]: Chave do perfil para uso em run_profile
+            
+        Raises:
+            KeyError: Se algum agente do perfil não estiver registrado
+        """
+        profile_key = frozenset(agent_names)
+        missing = sorted(profile_key - self.agents.keys())
+        if missing:
+            logger.error("Agentes {} não encontrados para o perfil {}", missing, sorted(profile_key))
+            raise KeyError(f"Agentes não encontrados: {', '.join(missing)}")
+        self._profiles[profile_key] = tuple(self.agents[name] for name in sorted(profile_key))
+        return profile_key
     
     def get_agent(self, agent_name: str) -> BaseAgent:
         """
@@ -53,15 +78,49 @@ class AgentManager:
         Returns:
             Dict[str, Any]: Resultados combinados das análises
         """
-        results = {}
-        
         # Se nenhum agente específico for solicitado, usa todos
         agents_to_run = [self.get_agent(name) for name in (agent_names or self.agents.keys())]
+        return await self._run_agents(agents_to_run, token_data)
+    
+    async def run_profile(self, profile_key: FrozenSet[str], token_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executa análise com um perfil de agentes pré-computado.
+        
+        Não faz busca por nome a cada chamada; perfis ainda não registrados são
+        computados na primeira execução.
+        
+        Args:
+            profile_key: Conjunto de nomes dos agentes (ver register_profile)
+            token_data: Dados do token para análise
+            
+        Returns:
+            Dict[str, Any]: Resultados combinados das análises
+        """
+        agents = self._profiles.get(profile_key)
+        if agents is None:
+            agents = self._profiles[self.register_profile(profile_key)]
+        return await self._run_agents(agents, token_data)
+    
+    async def _run_agents(self, agents_to_run: Iterable[BaseAgent], token_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valida a entrada e executa cada agente, isolando falhas individuais.
+        
+        Args:
+            agents_to_run: Agentes a executar
+            token_data: Dados do token para análise
+            
+        Returns:
+            Dict[str, Any]: Resultados indexados pelo nome do agente
+        """
+        results = {}
         
         for agent in agents_to_run:
             try:
-                # Valida dados de entrada
-                if not await agent.validate_input(token_data):
+                # Valida dados de entrada (caminho síncrono quando o agente oferece)
+                is_valid = agent.validate_input_sync(token_data)
+                if is_valid is None:
+                    is_valid = await agent.validate_input(token_data)
+                if not is_valid:
                     results[agent.name] = {"error": "Dados de entrada inválidos"}
                     continue
                 
@@ -77,6 +136,7 @@ class AgentManager:
     def clear_agents(self) -> None:
         """Remove todos os agentes registrados"""
         self.agents.clear()
+        self._profiles.clear()
 
 # Instância global do gerenciador de agentes
 agent_manager = AgentManager()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class BaseAgent(ABC):
     """Classe base para todos os agentes de análise"""
@@ -34,6 +34,30 @@ class BaseAgent(ABC):
         """
         pass
     
+    def validate_input_sync(self, token_data: Dict[str, Any]) -> Optional[bool]:
+        """
+        Validação síncrona opcional dos dados de entrada.
+        
+        Agentes cuja validação é uma função pura podem sobrescrever este método
+        para que o gerenciador evite o custo de criar uma corrotina por chamada.
+        
+        Args:
+            token_data: Dados do token para validação
+            
+        Returns:
+            Optional[bool]: Resultado da validação, ou None para usar validate_input
+        """
+        return None
+    
+    async def warmup(self) -> None:
+        """
+        Inicialização assíncrona executada na subida da aplicação.
+        
+        Agentes podem sobrescrever este método para abrir pools HTTP, carregar
+        configurações ou aquecer caches antes da primeira requisição.
+        """
+        return None
+    
     def get_agent_info(self) -> Dict[str, str]:
         """
         Retorna informações sobre o agente.
@@ -3,7 +3,8 @@ Classes e funções para gerenciar o acesso ao banco de dados.
 """
 import json
 import asyncio
-from typing import Dict, Any, Optional, List
+import orjson
+from typing import Dict, Any, Optional, List, Tuple, Callable
 import logging
 from datetime import datetime
 
@@ -13,6 +14,48 @@ from ..utils.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Parâmetros da fila de gravação de análises
+_WRITE_BATCH_SIZE = 256
+_WRITE_FLUSH_INTERVAL = 0.01  # segundos
+
+# Bytes serializados no event loop por operação; acima disso o restante vai para uma thread
+_INLINE_ENCODE_BYTES = 16 * 1024
+
+async def _encode_each(items: List[Any], encode: Callable[[Any], int]) -> None:
+    """
+    Serializa os itens em sequência, no event loop enquanto o volume for pequeno.
+    
+    Depois que `_INLINE_ENCODE_BYTES` bytes forem gerados, os itens restantes são
+    serializados numa thread, de modo que lotes pequenos não pagam a troca de
+    thread e lotes grandes não bloqueiam o loop.
+    
+    Args:
+        items: Itens a serializar, na ordem
+        encode: Função que serializa um item e retorna o tamanho gerado, em bytes
+    """
+    size = 0
+    for i, item in enumerate(items):
+        if size > _INLINE_ENCODE_BYTES:
+            await asyncio.to_thread(lambda rest: [encode(pending) for pending in rest], items[i:])
+            return
+        size += encode(item)
+
+def _encode_analysis_row(row: Dict[str, Any]) -> int:
+    """
+    Converte o resultado de uma análise para a coluna `result_json`.
+    
+    Args:
+        row: Linha a ser gravada (alterada no lugar)
+        
+    Returns:
+        Tamanho do JSON gerado, em bytes
+    """
+    if not isinstance(row.get("result"), dict):
+        return 0
+    payload = orjson.dumps(row.pop("result"))
+    row["result_json"] = payload.decode()
+    return len(payload)
+
 class Database:
     """
     Classe para gerenciar o acesso ao banco de dados.
@@ -24,12 +67,18 @@ class Database:
         Inicializa a conexão com o banco de dados.
         """
         self.supabase = supabase
+        # Fila de gravação e tarefa que a esvazia (criadas na primeira gravação)
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
         logger.info("Conexão com o banco de dados inicializada")
         
     async def save_analysis(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Salva uma análise no banco de dados.
         
+        A análise é colocada na fila de gravação e inserida junto com as demais
+        análises pendentes em inserts em lote.
+        
         Args:
             analysis_data: Dados da análise a ser salva
             
@@ -37,25 +86,147 @@ class Database:
             Dados da análise salva, incluindo ID
         """
         try:
-            # Preparar os dados para salvar
-            if "result" in analysis_data and isinstance(analysis_data["result"], dict):
-                # Converter dicionários para JSON
-                analysis_data["result_json"] = json.dumps(analysis_data["result"])
-                del analysis_data["result"]
+            # O resultado é serializado pelo flusher, junto com o restante do lote
+            if self._write_queue is None:
+                self._write_queue = asyncio.Queue()
+            # Reiniciar o flusher mantendo a fila, para não perder análises já enfileiradas
+            if self._flusher is None or self._flusher.done():
+                self._flusher = asyncio.create_task(self._flush_analyses())
                 
-            # Salvar na tabela de análises
-            result = await self.supabase.save_analysis(analysis_data)
+            future = asyncio.get_running_loop().create_future()
+            await self._write_queue.put((analysis_data, future))
+            return await future
             
-            if result.error:
-                logger.error(f"Erro ao salvar análise: {result.error}")
-                return {"error": str(result.error)}
-                
-            logger.info(f"Análise salva com sucesso. ID: {result.data[0].get('id')}")
-            return result.data[0]
+        except Exception as e:
+            logger.error("Erro ao salvar análise: %s", e)
+            return {"error": str(e)}
+            
+    async def _flush_analyses(self) -> None:
+        """
+        Esvazia a fila de gravação em lotes.
+        
+        Cada lote reúne até `_WRITE_BATCH_SIZE` análises ou o que chegar em
+        `_WRITE_FLUSH_INTERVAL` segundos após a primeira; o lote é serializado (numa
+        thread, se for grande) e salvo com um insert por conjunto de colunas (ver `_insert_rows`).
+        O resultado de cada linha é entregue ao future correspondente.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Dict[str, Any], asyncio.Future]] = [await self._write_queue.get()]
+            deadline = loop.time() + _WRITE_FLUSH_INTERVAL
+            while len(batch) < _WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                rows = [row for row, _ in batch]
+                await _encode_each(rows, _encode_analysis_row)
+                rows = await self._insert_rows(rows)
+            except Exception as e:
+                logger.error("Erro ao salvar análises: %s", e)
+                rows = [{"error": str(e)} for _ in batch]
+            
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(rows[i] if i < len(rows) else {"error": "Análise não retornada pelo banco"})
+                self._write_queue.task_done()
+    
+    async def _insert_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insere as linhas com um insert em lote para cada conjunto de colunas.
+        
+        O PostgREST exige que todas as linhas de um insert em lote tenham as mesmas
+        chaves; linhas de rotas diferentes (com ou sem `id`, `token_address`...) são
+        separadas em grupos, sem preencher colunas com None, para manter os valores
+        padrão da tabela.
+        
+        Args:
+            rows: Linhas já serializadas
+            
+        Returns:
+            Linha salva (ou erro) de cada entrada, na mesma ordem
+        """
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, row in enumerate(rows):
+            groups.setdefault(tuple(sorted(row)), []).append(i)
+        
+        results: List[Dict[str, Any]] = [{"error": "Análise não retornada pelo banco"} for _ in rows]
+        for indices in groups.values():
+            saved = await self._insert_group([rows[i] for i in indices])
+            for i, row in zip(indices, saved):
+                results[i] = row
+        return results
+    
+    async def _insert_group(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insere um grupo de linhas com as mesmas colunas; se o lote falhar, insere
+        linha a linha, para que uma linha inválida não derrube as demais.
+        
+        Args:
+            rows: Linhas com o mesmo conjunto de chaves
             
+        Returns:
+            Linha salva (ou erro) de cada entrada, na mesma ordem
+        """
+        try:
+            result = await self.supabase.save_analyses(rows)
+            error = result.get("error") if isinstance(result, dict) else getattr(result, "error", None)
         except Exception as e:
-            logger.error(f"Erro ao salvar análise: {str(e)}")
+            error = e
+        
+        if not error:
+            logger.info("%s análise(s) salva(s) com sucesso", len(result.data))
+            return result.data
+        logger.error("Erro ao salvar análises em lote: %s", error)
+        if len(rows) == 1:
+            return [{"error": str(error)}]
+        return list(await asyncio.gather(*(self._insert_one(row) for row in rows)))
+    
+    async def _insert_one(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insere uma única linha (caminho de fallback do insert em lote).
+        
+        Args:
+            row: Linha já serializada
+            
+        Returns:
+            Linha salva ou dicionário com o erro
+        """
+        try:
+            result = await self.supabase.save_analysis(row)
+            error = result.get("error") if isinstance(result, dict) else getattr(result, "error", None)
+            if error:
+                logger.error("Erro ao salvar análise: %s", error)
+                return {"error": str(error)}
+            return result.data[0] if result.data else {"error": "Análise não retornada pelo banco"}
+        except Exception as e:
+            logger.error("Erro ao salvar análise: %s", e)
             return {"error": str(e)}
+    
+    async def aclose(self) -> None:
+        """
+        Grava as análises ainda na fila e encerra o flusher.
+        """
+        if self._write_queue is None:
+            return
+        if not self._write_queue.empty() and (self._flusher is None or self._flusher.done()):
+            self._flusher = asyncio.create_task(self._flush_analyses())
+        await self._write_queue.join()
+        
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        # A fila pertence ao event loop atual; a próxima gravação cria outra
+        self._write_queue = None
             
     async def get_analysis(self, analysis_id: str) -> Dict[str, Any]:
         """
@@ -71,26 +242,17 @@ class Database:
             result = await self.supabase.get_analysis(analysis_id)
             
             if result.error:
-                logger.error(f"Erro ao obter análise: {result.error}")
+                logger.error("Erro ao obter análise: %s", result.error)
                 return {"error": str(result.error)}
                 
             if not result.data:
-                logger.warning(f"Análise não encontrada: {analysis_id}")
+                logger.warning("Análise não encontrada: %s", analysis_id)
                 return {"error": "Análise não encontrada"}
                 
-            # Converter JSON de volta para dicionário
-            analysis = result.data[0]
-            if "result_json" in analysis and analysis["result_json"]:
-                try:
-                    analysis["result"] = json.loads(analysis["result_json"])
-                    del analysis["result_json"]
-                except json.JSONDecodeError:
-                    logger.error(f"Erro ao decodificar JSON da análise: {analysis_id}")
-                    
-            return analysis
+            return self._hydrate_analysis(result.data[0])
             
         except Exception as e:
-            logger.error(f"Erro ao obter análise: {str(e)}")
+            logger.error("Erro ao obter análise: %s", e)
             return {"error": str(e)}
             
     async def get_user_analyses(self, user_id: str, 
@@ -111,25 +273,46 @@ class Database:
             result = await self.supabase.get_user_analyses(user_id, analysis_type, limit)
             
             if result.error:
-                logger.error(f"Erro ao obter análises do usuário: {result.error}")
+                logger.error("Erro ao obter análises do usuário: %s", result.error)
                 return [{"error": str(result.error)}]
                 
-            # Converter JSON de volta para dicionário em cada análise
-            analyses = result.data
-            for analysis in analyses:
-                if "result_json" in analysis and analysis["result_json"]:
-                    try:
-                        analysis["result"] = json.loads(analysis["result_json"])
-                        del analysis["result_json"]
-                    except json.JSONDecodeError:
-                        logger.error(f"Erro ao decodificar JSON da análise: {analysis.get('id')}")
-                        
-            return analyses
+            return [self._hydrate_analysis(analysis) for analysis in result.data]
             
         except Exception as e:
-            logger.error(f"Erro ao obter análises do usuário: {str(e)}")
+            logger.error("Erro ao obter análises do usuário: %s", e)
             return [{"error": str(e)}]
             
+    def _hydrate_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decodifica o JSON do resultado e achata seus campos na própria linha.
+        
+        Os campos do resultado são copiados para o nível da linha (sem sobrescrever
+        colunas existentes), junto com `analysis_id` e `timestamp`, para que as rotas
+        construam os modelos de resposta diretamente a partir do dicionário.
+        
+        Args:
+            analysis: Linha retornada pelo banco
+            
+        Returns:
+            A mesma linha, hidratada
+        """
+        if "result_json" in analysis and analysis["result_json"]:
+            try:
+                analysis["result"] = json.loads(analysis["result_json"])
+                del analysis["result_json"]
+            except json.JSONDecodeError:
+                logger.error("Erro ao decodificar JSON da análise: %s", analysis.get('id'))
+        
+        result = analysis.get("result")
+        if isinstance(result, dict):
+            for key, value in result.items():
+                analysis.setdefault(key, value)
+        
+        analysis["analysis_id"] = analysis.get("id")
+        if not analysis.get("timestamp"):
+            analysis["timestamp"] = analysis.get("created_at")
+        return analysis
+            
     async def save_portfolio(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Salva um portfólio no banco de dados.
@@ -143,22 +326,28 @@ class Database:
         try:
             # Preparar os dados para salvar
             if "assets" in portfolio_data and isinstance(portfolio_data["assets"], list):
-                # Converter lista para JSON
-                portfolio_data["assets_json"] = json.dumps(portfolio_data["assets"])
-                del portfolio_data["assets"]
+                # Converter lista para JSON (portfólios grandes terminam fora do event loop)
+                parts: List[bytes] = []
+                
+                def encode_asset(asset: Any) -> int:
+                    parts.append(orjson.dumps(asset))
+                    return len(parts[-1])
+                
+                await _encode_each(portfolio_data.pop("assets"), encode_asset)
+                portfolio_data["assets_json"] = (b"[" + b",".join(parts) + b"]").decode()
                 
             # Salvar na tabela de portfólios
             result = await self.supabase.save_portfolio(portfolio_data)
             
             if result.error:
-                logger.error(f"Erro ao salvar portfólio: {result.error}")
+                logger.error("Erro ao salvar portfólio: %s", result.error)
                 return {"error": str(result.error)}
                 
-            logger.info(f"Portfólio salvo com sucesso. ID: {result.data[0].get('id')}")
+            logger.info("Portfólio salvo com sucesso. ID: %s", result.data[0].get('id'))
             return result.data[0]
             
         except Exception as e:
-            logger.error(f"Erro ao salvar portfólio: {str(e)}")
+            logger.error("Erro ao salvar portfólio: %s", e)
             return {"error": str(e)}
             
     async def get_user_portfolio(self, user_id: str) -> Dict[str, Any]:
@@ -175,11 +364,11 @@ class Database:
             result = await self.supabase.get_user_portfolio(user_id)
             
             if result.error:
-                logger.error(f"Erro ao obter portfólio do usuário: {result.error}")
+                logger.error("Erro ao obter portfólio do usuário: %s", result.error)
                 return {"error": str(result.error)}
                 
             if not result.data:
-                logger.warning(f"Portfólio não encontrado para o usuário: {user_id}")
+                logger.warning("Portfólio não encontrado para o usuário: %s", user_id)
                 return {"error": "Portfólio não encontrado"}
                 
             # Converter JSON de volta para lista
@@ -189,10 +378,13 @@ class Database:
                     portfolio["assets"] = json.loads(portfolio["assets_json"])
                     del portfolio["assets_json"]
                 except json.JSONDecodeError:
-                    logger.error(f"Erro ao decodificar JSON do portfólio: {portfolio.get('id')}")
+                    logger.error("Erro ao decodificar JSON do portfólio: %s", portfolio.get('id'))
                     
             return portfolio
             
         except Exception as e:
-            logger.error(f"Erro ao obter portfólio do usuário: {str(e)}")
-            return {"error": str(e)} 
\ No newline at end of file
+            logger.error("Erro ao obter portfólio do usuário: %s", e)
+            return {"error": str(e)}
+
+# Instância compartilhada pelas rotas (uma única fila de gravação)
+db = Database()
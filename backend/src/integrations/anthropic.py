@@ -2,19 +2,333 @@
 Cliente para interação com a API Anthropic Claude para análise de sentimento e processamento de linguagem natural.
 """
 import os
+import re
+import sys
+import copy
 import asyncio
-from typing import Dict, Any, List, Optional
-import json
-from datetime import datetime
+import hashlib
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Set, Tuple
+import orjson
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
-import anthropic
+from cachetools import TTLCache
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+from aiolimiter import AsyncLimiter
+import httpx
+
+# Trecho JSON dentro do texto da resposta do Claude
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+def _fingerprint(*parts: str) -> str:
+    """
+    Gera uma chave curta e estável para o cache a partir dos textos.
+    
+    Args:
+        parts: Textos que compõem a chave
+        
+    Returns:
+        str: Hash hexadecimal de 16 bytes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """
+    Indica se uma falha da API vale uma nova tentativa.
+    
+    Erros 5xx e falhas de conexão/timeout são repetidos; 4xx (incluindo 429,
+    controlado pelo limitador de taxa) não.
+    
+    Args:
+        exc: Exceção levantada pela chamada
+        
+    Returns:
+        bool: True se a chamada deve ser repetida
+    """
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None and isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code
+    if status_code is not None:
+        return status_code >= 500
+    # O SDK é importado sob demanda; só pode ter levantado erros se já estiver carregado
+    sdk = sys.modules.get("anthropic")
+    if sdk is not None and isinstance(exc, sdk.APIConnectionError):
+        return True
+    return isinstance(exc, httpx.TransportError)
+
+# Política de novas tentativas das chamadas ao Claude
+_retry_transient = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_exception(_is_transient_error),
+    reraise=True
+)
+
+# Caracteres ASCII por token, em média; fora do ASCII (CJK, emoji) conta-se um token por caractere
+_ASCII_CHARS_PER_TOKEN = 4
+
+def _trim_to_token_budget(text: str, max_tokens: int) -> str:
+    """
+    Corta o texto para caber num orçamento aproximado de tokens.
+    
+    Args:
+        text: Texto a ser cortado
+        max_tokens: Número máximo de tokens estimados
+        
+    Returns:
+        str: O próprio texto, ou seu prefixo seguido de "..." se exceder o orçamento
+    """
+    budget = max_tokens * _ASCII_CHARS_PER_TOKEN
+    if text.isascii():
+        return text if len(text) <= budget else text[:budget] + "..."
+    
+    # Custo em quartos de token: 1 por caractere ASCII, 4 pelos demais
+    used = 0
+    for i, char in enumerate(text):
+        used += 1 if char < "\x80" else _ASCII_CHARS_PER_TOKEN
+        if used > budget:
+            return text[:i] + "..."
+    return text
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Estima o número de tokens de um texto, com a mesma regra de _trim_to_token_budget.
+    
+    Args:
+        text: Texto a ser medido
+        
+    Returns:
+        int: Número aproximado de tokens
+    """
+    quarters = len(text) if text.isascii() else sum(1 if char < "\x80" else _ASCII_CHARS_PER_TOKEN for char in text)
+    return -(-quarters // _ASCII_CHARS_PER_TOKEN)
+
+def _fit_texts_to_token_budget(texts: List[str], max_tokens: int) -> List[str]:
+    """
+    Mantém os textos, em ordem, até esgotar um orçamento de tokens comum a todos.
+    
+    O texto que ultrapassa o orçamento é cortado e os seguintes são descartados.
+    
+    Args:
+        texts: Textos a serem ajustados
+        max_tokens: Número máximo de tokens estimados somando todos os textos
+        
+    Returns:
+        List[str]: Textos que cabem no orçamento
+    """
+    fitted = []
+    remaining = max_tokens
+    for text in texts:
+        if remaining <= 0:
+            break
+        text = _trim_to_token_budget(text, remaining)
+        fitted.append(text)
+        remaining -= _estimate_tokens(text)
+    return fitted
+
+def _extract_json(text: str) -> Any:
+    """
+    Extrai e decodifica o trecho JSON de uma resposta em texto livre.
+    
+    Args:
+        text: Texto da resposta
+        
+    Returns:
+        Any: JSON decodificado, ou None se a resposta não contiver JSON
+        
+    Raises:
+        orjson.JSONDecodeError: Se o trecho encontrado não for JSON válido
+    """
+    match = _JSON_RE.search(text)
+    return orjson.loads(match.group(0)) if match else None
+
+def _tool_input(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Retorna a entrada da primeira chamada de ferramenta de uma resposta do Claude.
+    
+    Args:
+        message: Corpo JSON da resposta da API de mensagens
+        
+    Returns:
+        Optional[Dict[str, Any]]: Argumentos da ferramenta, ou None se não houver chamada
+    """
+    for block in message.get("content", []):
+        if block.get("type") == "tool_use":
+            return block.get("input")
+    return None
+
+class _BatchAggregator:
+    """
+    Agrega chamadas concorrentes em lotes.
+    
+    Cada chamada entra numa fila e aguarda um future; uma tarefa em segundo plano
+    junta até `max_batch_size` itens (ou o que chegar em `batch_wait_timeout_s`)
+    e processa o lote inteiro de uma vez.
+    """
+    
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 32, batch_wait_timeout_s: float = 0.005):
+        """
+        Inicializa o agregador.
+        
+        Args:
+            process_batch: Função que processa uma lista de itens e retorna os resultados na mesma ordem
+            max_batch_size: Tamanho máximo de cada lote
+            batch_wait_timeout_s: Tempo máximo de espera por novos itens após o primeiro
+        """
+        self._process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_s = batch_wait_timeout_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+    
+    async def submit(self, item: Any) -> Any:
+        """
+        Enfileira um item e aguarda o seu resultado.
+        
+        Args:
+            item: Item a ser processado
+            
+        Returns:
+            Any: Resultado correspondente ao item
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        # Reiniciar a tarefa mantendo a fila, para não perder itens já enfileirados
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """
+        Forma os lotes e dispara o processamento de cada um sem bloquear a fila.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_wait_timeout_s
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """
+        Processa um lote e entrega cada resultado ao seu future.
+        
+        Args:
+            batch: Pares (item, future) do lote
+        """
+        try:
+            results = await self._process_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                if i < len(results):
+                    future.set_result(results[i])
+                else:
+                    future.set_exception(RuntimeError("Lote processado sem resultado para o item"))
+    
+    async def aclose(self) -> None:
+        """
+        Processa os itens ainda na fila, aguarda os lotes em andamento e encerra a tarefa.
+        """
+        if self._queue is None:
+            return
+        if not self._queue.empty() and (self._worker is None or self._worker.done()):
+            self._worker = asyncio.create_task(self._run())
+        await self._queue.join()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # A fila fica ligada ao event loop atual; a próxima chamada cria outra
+        self._queue = None
 
 class AnthropicClient:
     """
     Cliente para interação com a API Anthropic Claude.
     """
     
+    SENTIMENT_SYSTEM_PROMPT = """
+        Você é um analisador de sentimento especializado em criptomoedas e DeFi. 
+        Avalie o texto fornecido e determine o sentimento geral em relação ao ativo ou protocolo mencionado.
+        Registre o resultado com a ferramenta report_sentiment, informando:
+        - score: Valor de 0 a 100, onde 0 é extremamente negativo, 50 é neutro e 100 é extremamente positivo
+        - sentiment: Uma das seguintes categorias: "very_negative", "negative", "slightly_negative", "neutral", "slightly_positive", "positive", "very_positive"
+        - confidence: Sua confiança na análise, de 0 a 1
+        - keywords: Lista das 3-5 palavras-chave mais importantes do texto
+        """
+    
+    SUMMARY_SYSTEM_PROMPT = """
+        Você é um analista especializado em criptomoedas e DeFi. 
+        Analise as discussões fornecidas e crie um resumo conciso dos pontos principais,
+        com foco no ativo indicado na mensagem, quando houver.
+        
+        Responda em formato JSON com as seguintes chaves:
+        - summary: Um resumo de 2-3 parágrafos destacando os temas principais das discussões
+        - sentiment: O sentimento geral predominante ("very_negative", "negative", "slightly_negative", "neutral", "slightly_positive", "positive", "very_positive")
+        - key_points: Lista de 3-7 pontos-chave extraídos das discussões
+        - controversies: Quaisquer controvérsias ou pontos de discordância importantes
+        - insights: Até 3 insights ou conclusões importantes
+        """
+    
+    # Orçamento de tokens de entrada (equivale aos antigos 8000/12000 caracteres em ASCII)
+    SENTIMENT_MAX_INPUT_TOKENS = 2000
+    SUMMARY_MAX_INPUT_TOKENS = 3000
+    
+    # Textos por chamada parcial na sumarização em map-reduce
+    SUMMARY_CHUNK_SIZE = 3
+    
+    # Esquema do resultado de sentimento, validado pela própria API via tool use
+    SENTIMENT_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "score": {"type": "number", "minimum": 0, "maximum": 100},
+            "sentiment": {
+                "type": "string",
+                "enum": ["very_negative", "negative", "slightly_negative", "neutral",
+                         "slightly_positive", "positive", "very_positive"]
+            },
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+            "keywords": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["score", "sentiment", "confidence", "keywords"]
+    }
+    
+    SENTIMENT_TOOL = {
+        "name": "report_sentiment",
+        "description": "Registra a análise de sentimento do texto.",
+        "input_schema": SENTIMENT_SCHEMA
+    }
+    
+    MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+    API_VERSION = "2023-06-01"
+    
     def __init__(self):
         """
         Inicializa o cliente Anthropic Claude com a API key do .env.
@@ -28,6 +342,19 @@ class AnthropicClient:
         self.client = None
         self.async_client = None
         
+        # Pool HTTP compartilhado e limites de concorrência/taxa, criados na primeira
+        # chamada (ver _get_http_client) e descartados em aclose
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[AsyncLimiter] = None
+        
+        # Resultados recentes, indexados pelo hash do texto enviado
+        self._sentiment_cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        self._summary_cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        
+        # Chamadas concorrentes de análise de sentimento são agrupadas e deduplicadas
+        self._sentiment_batcher = _BatchAggregator(self._analyze_sentiment_batch)
+        
     def _get_client(self):
         """
         Obtém o cliente Anthropic.
@@ -36,9 +363,27 @@ class AnthropicClient:
             anthropic.Anthropic: Cliente da API
         """
         if not self.client and self.api_key:
+            import anthropic
             self.client = anthropic.Anthropic(api_key=self.api_key)
         return self.client
     
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Obtém o pool HTTP compartilhado, criando-o (junto com os limitadores) na primeira chamada.
+        
+        Returns:
+            httpx.AsyncClient: Cliente usado por todas as chamadas assíncronas ao Claude
+        """
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+            # Limites de concorrência e de requisições por minuto
+            self._semaphore = asyncio.Semaphore(int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "40")))
+            self._rate_limiter = AsyncLimiter(int(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "40")), 60)
+        return self.http_client
+    
     def _get_async_client(self):
         """
         Obtém o cliente assíncrono da Anthropic.
@@ -47,14 +392,91 @@ class AnthropicClient:
             anthropic.AsyncAnthropic: Cliente assíncrono da API
         """
         if not self.async_client and self.api_key:
-            self.async_client = anthropic.AsyncAnthropic(api_key=self.api_key)
+            import anthropic
+            # Novas tentativas ficam com _retry_transient; 429 é evitado pelo limitador
+            self.async_client = anthropic.AsyncAnthropic(
+                api_key=self.api_key, http_client=self._get_http_client(), max_retries=0
+            )
         return self.async_client
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def _create_message(self, **kwargs) -> Any:
+        """
+        Envia uma mensagem ao Claude respeitando os limites de concorrência e de taxa.
+        
+        Args:
+            kwargs: Parâmetros de messages.create
+            
+        Returns:
+            Any: Resposta da API de mensagens
+        """
+        client = self._get_async_client()
+        async with self._semaphore:
+            async with self._rate_limiter:
+                return await client.messages.create(**kwargs)
+    
+    async def _raw_messages(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Chama a API de mensagens diretamente pelo pool HTTP, sem o SDK.
+        
+        Usado no caminho de sentimento, que só precisa do bloco de ferramenta da
+        resposta e dispensa a validação dos modelos do SDK.
+        
+        Args:
+            payload: Corpo da requisição de /v1/messages
+            
+        Returns:
+            Dict[str, Any]: Corpo JSON da resposta
+        """
+        http_client = self._get_http_client()
+        async with self._semaphore:
+            async with self._rate_limiter:
+                response = await http_client.post(
+                    self.MESSAGES_URL,
+                    content=orjson.dumps(payload),
+                    headers={
+                        "x-api-key": self.api_key,
+                        "anthropic-version": self.API_VERSION,
+                        "content-type": "application/json"
+                    }
+                )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    @staticmethod
+    def _cached_system(prompt: str) -> List[Dict[str, Any]]:
+        """
+        Monta o system prompt como bloco elegível ao prompt caching da Anthropic.
+        
+        Args:
+            prompt: Texto fixo do system prompt (constante da classe)
+            
+        Returns:
+            List[Dict[str, Any]]: Bloco de texto com cache_control efêmero
+        """
+        return [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
+    
+    async def aclose(self) -> None:
+        """
+        Encerra o agregador de sentimento e fecha o pool de conexões HTTP compartilhado.
+        
+        O pool e os limitadores são recriados na próxima chamada, então a instância
+        continua utilizável depois de um novo ciclo de vida da aplicação.
+        """
+        await self._sentiment_batcher.aclose()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        self.http_client = None
+        self.async_client = None
+        self._semaphore = None
+        self._rate_limiter = None
+    
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analisa o sentimento de um texto usando o Claude.
         
+        Chamadas simultâneas são agrupadas pelo agregador, que analisa cada texto
+        distinto uma única vez.
+        
         Args:
             text: Texto a ser analisado
             
@@ -70,65 +492,63 @@ class AnthropicClient:
                 "is_simulated": True
             }
         
-        client = self._get_async_client()
+        # Limitar o tamanho do texto para evitar custos excessivos
+        text = _trim_to_token_budget(text, self.SENTIMENT_MAX_INPUT_TOKENS)
         
-        system_prompt = """
-        Você é um analisador de sentimento especializado em criptomoedas e DeFi. 
-        Avalie o texto fornecido e determine o sentimento geral em relação ao ativo ou protocolo mencionado.
-        Responda em formato JSON com as seguintes chaves:
-        - score: Valor de 0 a 100, onde 0 é extremamente negativo, 50 é neutro e 100 é extremamente positivo
-        - sentiment: Uma das seguintes categorias: "very_negative", "negative", "slightly_negative", "neutral", "slightly_positive", "positive", "very_positive"
-        - confidence: Sua confiança na análise, de 0 a 1
-        - keywords: Lista das 3-5 palavras-chave mais importantes do texto
+        cache_key = _fingerprint(text)
+        cached = self._sentiment_cache.get(cache_key)
+        if cached is not None:
+            # Cópia: o chamador pode alterar o resultado (inclusive a lista de keywords)
+            return copy.deepcopy(cached)
+        
+        result = await self._sentiment_batcher.submit(text)
+        if "error" not in result:
+            self._sentiment_cache[cache_key] = copy.deepcopy(result)
+        return result
+    
+    async def _analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
         """
+        Analisa o sentimento de vários textos, com uma requisição por texto distinto.
         
-        try:
-            # Limitar o tamanho do texto para evitar custos excessivos
-            if len(text) > 8000:
-                text = text[:8000] + "..."
-                
-            message = await client.messages.create(
-                model=self.model,
-                system=system_prompt,
-                max_tokens=300,
-                messages=[
-                    {"role": "user", "content": text}
-                ]
-            )
-            
-            response_content = message.content[0].text
+        Cada texto vai numa mensagem própria, de modo que o conteúdo de um não
+        influencia o resultado de outro; as requisições compartilham o pool HTTP
+        e os limites de concorrência e taxa do cliente.
+        
+        Args:
+            texts: Textos a serem analisados
             
-            # Extrair apenas o JSON da resposta
-            json_match = response_content.strip()
+        Returns:
+            List[Dict[str, Any]]: Resultados na mesma ordem dos textos
+        """
+        # Textos repetidos no mesmo lote geram uma única requisição
+        unique = list(dict.fromkeys(texts))
+        results = await asyncio.gather(*(self._analyze_sentiment_single(text) for text in unique))
+        by_text = dict(zip(unique, results))
+        # Cópias: chamadores com o mesmo texto não compartilham o mesmo dicionário
+        return [dict(by_text[text]) for text in texts]
+    
+    async def _analyze_sentiment_single(self, text: str) -> Dict[str, Any]:
+        """
+        Analisa o sentimento de um único texto usando o Claude.
+        
+        Args:
+            text: Texto a ser analisado
             
-            # Verificar se a resposta contém JSON
-            try:
-                if "{" in json_match and "}" in json_match:
-                    # Extrair apenas a parte JSON da resposta
-                    json_start = json_match.find("{")
-                    json_end = json_match.rfind("}") + 1
-                    json_str = json_match[json_start:json_end]
-                    result = json.loads(json_str)
-                else:
-                    # Se não encontrar JSON, criar um resultado padrão
-                    result = {
-                        "score": 50,
-                        "sentiment": "neutral",
-                        "confidence": 0.5,
-                        "keywords": ["unclear"]
-                    }
-                
-                return result
-                
-            except json.JSONDecodeError:
-                logger.error(f"Erro ao decodificar JSON da resposta: {response_content}")
-                return {
+        Returns:
+            Dict[str, Any]: Resultado da análise de sentimento com score (0-100) e sentimento predominante
+        """
+        try:
+            result = await self._request_sentiment(text)
+            if result is None:
+                # Se o Claude não chamar a ferramenta, criar um resultado padrão
+                result = {
                     "score": 50,
                     "sentiment": "neutral",
                     "confidence": 0.5,
-                    "error": "Falha ao extrair análise",
-                    "keywords": ["error", "parsing"]
+                    "keywords": ["unclear"]
                 }
+            
+            return result
                 
         except Exception as e:
             logger.error(f"Erro ao analisar sentimento: {str(e)}")
@@ -140,11 +560,37 @@ class AnthropicClient:
                 "keywords": ["error"]
             }
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    @_retry_transient
+    async def _request_sentiment(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Envia um texto ao Claude, forçando a chamada da ferramenta report_sentiment.
+        
+        Args:
+            text: Texto a ser analisado
+            
+        Returns:
+            Optional[Dict[str, Any]]: Entrada da ferramenta, já no formato do esquema
+        """
+        message = await self._raw_messages({
+            "model": self.model,
+            "system": self._cached_system(self.SENTIMENT_SYSTEM_PROMPT),
+            "max_tokens": 300,
+            "tools": [self.SENTIMENT_TOOL],
+            "tool_choice": {"type": "tool", "name": self.SENTIMENT_TOOL["name"]},
+            "messages": [
+                {"role": "user", "content": text}
+            ]
+        })
+        
+        return _tool_input(message)
+    
     async def summarize_discussions(self, texts: List[str], query: str = None) -> Dict[str, Any]:
         """
         Sumariza múltiplos textos de discussões sobre um token.
         
+        Com mais de um grupo de textos, cada grupo é resumido em paralelo e os
+        resumos parciais são combinados numa chamada final (map-reduce).
+        
         Args:
             texts: Lista de textos para sumarizar
             query: Consulta ou token específico para focar
@@ -160,48 +606,62 @@ class AnthropicClient:
                 "is_simulated": True
             }
         
-        client = self._get_async_client()
+        texts = texts[:10]  # Limitar a 10 textos para economizar tokens
+        # O orçamento vale para a entrada inteira, não para cada grupo do map-reduce
+        texts = _fit_texts_to_token_budget(texts, self.SUMMARY_MAX_INPUT_TOKENS)
+        focus_point = f" sobre {query}" if query else ""
         
-        # Preparar o contexto com os textos
-        combined_text = "\n---\n".join(texts[:10])  # Limitar a 10 textos para economizar tokens
+        if len(texts) <= self.SUMMARY_CHUNK_SIZE:
+            return await self._summarize_texts(texts, focus_point, max_tokens=800)
         
-        if len(combined_text) > 12000:
-            combined_text = combined_text[:12000] + "..."
+        # Map: resumir cada grupo de textos em paralelo
+        chunks = [texts[i:i + self.SUMMARY_CHUNK_SIZE] for i in range(0, len(texts), self.SUMMARY_CHUNK_SIZE)]
+        partials = await asyncio.gather(
+            *(self._summarize_texts(chunk, focus_point, max_tokens=300) for chunk in chunks)
+        )
         
-        focus_point = f" sobre {query}" if query else ""
+        # Resumos parciais com erro não entram no reduce
+        partials = [partial for partial in partials if "error" not in partial]
+        if not partials:
+            return self._summary_error("Nenhum resumo parcial foi gerado")
         
-        system_prompt = f"""
-        Você é um analista especializado em criptomoedas e DeFi. 
-        Analise as discussões fornecidas{focus_point} e crie um resumo conciso dos pontos principais.
+        # Reduce: combinar os resumos parciais
+        partial_texts = []
+        for partial in partials:
+            key_points = "; ".join(str(point) for point in partial.get("key_points") or [])
+            partial_texts.append(f"{partial.get('summary', '')}\nPontos-chave: {key_points}")
+        return await self._summarize_texts(partial_texts, focus_point, max_tokens=800)
+    
+    async def _summarize_texts(self, texts: List[str], focus_point: str, max_tokens: int) -> Dict[str, Any]:
+        """
+        Resume um grupo de textos com uma chamada ao Claude.
         
-        Responda em formato JSON com as seguintes chaves:
-        - summary: Um resumo de 2-3 parágrafos destacando os temas principais das discussões
-        - sentiment: O sentimento geral predominante ("very_negative", "negative", "slightly_negative", "neutral", "slightly_positive", "positive", "very_positive")
-        - key_points: Lista de 3-7 pontos-chave extraídos das discussões
-        - controversies: Quaisquer controvérsias ou pontos de discordância importantes
-        - insights: Até 3 insights ou conclusões importantes
+        Args:
+            texts: Textos a serem resumidos
+            focus_point: Trecho com o foco da análise (ex: " sobre BTC")
+            max_tokens: Limite de tokens da resposta
+            
+        Returns:
+            Dict[str, Any]: Resumo das discussões
         """
+        # Preparar o contexto com os textos
+        combined_text = "\n---\n".join(texts)
+        
+        combined_text = _trim_to_token_budget(combined_text, self.SUMMARY_MAX_INPUT_TOKENS)
+        
+        cache_key = _fingerprint(combined_text, focus_point, str(max_tokens))
+        cached = self._summary_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
         
         try:
-            message = await client.messages.create(
-                model=self.model,
-                system=system_prompt,
-                max_tokens=800,
-                messages=[
-                    {"role": "user", "content": f"Por favor, analise estas discussões{focus_point}:\n\n{combined_text}"}
-                ]
-            )
-            
-            response_content = message.content[0].text
+            response_content = await self._request_summary(combined_text, focus_point, max_tokens)
             
             # Extrair apenas o JSON da resposta
             try:
-                if "{" in response_content and "}" in response_content:
-                    # Extrair apenas a parte JSON da resposta
-                    json_start = response_content.find("{")
-                    json_end = response_content.rfind("}") + 1
-                    json_str = response_content[json_start:json_end]
-                    result = json.loads(json_str)
+                result = _extract_json(response_content)
+                if result is not None:
+                    self._summary_cache[cache_key] = copy.deepcopy(result)
                 else:
                     # Se não encontrar JSON, criar um resultado padrão
                     result = {
@@ -209,12 +669,13 @@ class AnthropicClient:
                         "sentiment": "neutral",
                         "key_points": ["Dados insuficientes para análise"],
                         "controversies": [],
-                        "insights": []
+                        "insights": [],
+                        "error": "Resposta sem JSON"
                     }
                 
                 return result
                 
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.error(f"Erro ao decodificar JSON da resposta: {response_content}")
                 # Tentar extrair ao menos o resumo
                 return {
@@ -222,18 +683,56 @@ class AnthropicClient:
                     "sentiment": "neutral",
                     "key_points": ["Erro na análise estruturada"],
                     "controversies": [],
-                    "insights": []
+                    "insights": [],
+                    "error": "JSON inválido na resposta"
                 }
                 
         except Exception as e:
             logger.error(f"Erro ao sumarizar discussões: {str(e)}")
-            return {
-                "summary": "Ocorreu um erro ao processar as discussões.",
-                "sentiment": "neutral",
-                "key_points": [f"Erro: {str(e)}"],
-                "controversies": [],
-                "insights": []
-            }
+            return self._summary_error(str(e))
+    
+    @staticmethod
+    def _summary_error(error: str) -> Dict[str, Any]:
+        """
+        Monta o resultado de uma sumarização que falhou.
+        
+        Args:
+            error: Descrição do erro
+            
+        Returns:
+            Dict[str, Any]: Resumo padrão, com a chave "error"
+        """
+        return {
+            "summary": "Ocorreu um erro ao processar as discussões.",
+            "sentiment": "neutral",
+            "key_points": [f"Erro: {error}"],
+            "controversies": [],
+            "insights": [],
+            "error": error
+        }
+    
+    @_retry_transient
+    async def _request_summary(self, combined_text: str, focus_point: str, max_tokens: int) -> str:
+        """
+        Envia as discussões ao Claude e retorna o texto da resposta.
+        
+        Args:
+            combined_text: Discussões já concatenadas
+            focus_point: Trecho com o foco da análise
+            max_tokens: Limite de tokens da resposta
+            
+        Returns:
+            str: Texto da resposta
+        """
+        message = await self._create_message(
+            model=self.model,
+            system=self._cached_system(self.SUMMARY_SYSTEM_PROMPT),
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "user", "content": f"Por favor, analise estas discussões{focus_point}:\n\n{combined_text}"}
+            ]
+        )
+        return message.content[0].text
 
 # Instância global para uso em toda a aplicação
 anthropic_client = AnthropicClient() 
\ No newline at end of file
@@ -1,16 +1,146 @@
 """
 Cliente para obter dados on-chain de exploradores de blockchain através de web scraping.
 """
-import os
 import httpx
+import hishel
+import os
 import re
-import json
-from bs4 import BeautifulSoup
 from typing import Dict, List, Any, Optional
 from loguru import logger
-from datetime import datetime, timedelta
+from datetime import datetime
+from cachetools import TTLCache
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import asyncio
+import hashlib
+from lxml import etree, html as lxml_html
+
+# Endereço EVM: 0x seguido de 40 dígitos hexadecimais
+_ADDR_RE = re.compile(r'0x[a-fA-F0-9]{40}')
+
+# Padrões usados na extração de valores das páginas
+_RE_DECIMAL = re.compile(r'(\d+\.?\d*)')
+_RE_INT = re.compile(r'(\d+)')
+_RE_NUM_COMMA = re.compile(r'([\d,\.]+)')
+# Caracteres removidos das células numéricas antes da conversão direta para float
+_DIGIT_KEEP = str.maketrans('', '', ', \t\n%')
+_RE_DECIMALS = re.compile(r'Decimals:\s*(\d+)')
+
+def _has_class(name: str) -> str:
+    """
+    Monta o predicado XPath equivalente ao seletor CSS ".name".
+    
+    Args:
+        name: Nome da classe
+        
+    Returns:
+        str: Predicado XPath
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Consultas XPath compiladas uma única vez (sem "smart strings", que mantêm a árvore viva)
+# Página de endereço
+_XP_BALANCE = etree.XPath(f"(//div[{_has_class('card-body')}]//span[{_has_class('u-label')}])[1]")
+_XP_IS_CONTRACT = etree.XPath("boolean(//*[@id='ContentPlaceHolder1_li_contracts' or @id='contracts-tab'])")
+_XP_TOKEN_NAME = etree.XPath(f"(//span[{_has_class('h4')}])[1]")
+_XP_TOKEN_SYMBOL = etree.XPath(f"(//span[{_has_class('text-secondary')}])[1]")
+_XP_DECIMALS = etree.XPath("(//*[text()[contains(., 'Decimals')]])[1]")
+_XP_TOTAL_SUPPLY = etree.XPath("(//*[text()[contains(., 'Total Supply')]])[1]")
+_XP_TXS_LINK = etree.XPath("(//a[contains(@href, 'txs')])[1]")
+# Tabelas: <tbody> da primeira tabela com a classe "table" e suas linhas
+_XP_TABLE_TBODY = etree.XPath(f"(//table[{_has_class('table')}])[1]//tbody")
+_XP_TBODY_ROWS = etree.XPath("./tr")
+# Página de limite de requisições: aviso sem nenhuma tabela de dados
+_XP_RATE_LIMITED = etree.XPath(
+    f"boolean(//div[{_has_class('alert-warning')}]) and not((//table[{_has_class('table')}])[1]//tbody)"
+)
+_XP_TDS = etree.XPath("./td")
+_XP_FIRST_A = etree.XPath("(.//a)[1]")
+_XP_SPAN_TEXT = etree.XPath("normalize-space((.//span)[1])", smart_strings=False)
+_XP_SPAN_TITLE = etree.XPath("string((.//span[@title])[1]/@title)", smart_strings=False)
+
+def _url_cache_key(url: str) -> str:
+    """
+    Gera a chave do cache em disco para uma URL.
+    
+    Args:
+        url: URL da página
+        
+    Returns:
+        str: Hash hexadecimal da URL
+    """
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+def _disk_cache_key(request: Any, body: Optional[bytes] = None) -> str:
+    """
+    Gerador de chaves do hishel: usa apenas a URL, para que uma página possa
+    ser removida do cache em disco a partir dela.
+    
+    Args:
+        request: Requisição httpcore
+        body: Corpo da requisição (ignorado; só há GETs)
+        
+    Returns:
+        str: Chave da página no cache em disco
+    """
+    return _url_cache_key(bytes(request.url).decode("ascii"))
+
+def _first_anchor(cell: Any) -> Optional[Any]:
+    """
+    Retorna o primeiro <a> de uma célula.
+    
+    Args:
+        cell: Célula da tabela
+        
+    Returns:
+        Elemento <a>, ou None se a célula não tiver link
+    """
+    anchors = _XP_FIRST_A(cell)
+    return anchors[0] if anchors else None
+
+def _href_tail(anchor: Optional[Any]) -> str:
+    """
+    Retorna o último segmento do link de um <a>.
+    
+    Args:
+        anchor: Elemento <a> (ou None)
+        
+    Returns:
+        str: Endereço ou hash do link, ou "Unknown" se não houver link
+    """
+    href = anchor.get("href") if anchor is not None else None
+    return href.rsplit("/", 1)[-1] if href else "Unknown"
+
+def _text(element: Any) -> str:
+    """
+    Retorna o texto de um elemento lxml sem espaços nas pontas.
+    
+    Args:
+        element: Elemento lxml
+        
+    Returns:
+        str: Texto do elemento
+    """
+    return element.text_content().strip()
+
+def _parse_number(text: str) -> float:
+    """
+    Converte o texto de uma célula numérica (ex: "1,234.5" ou "12.5%") para float.
+    
+    Args:
+        text: Texto da célula
+        
+    Returns:
+        float: Valor extraído, ou 0.0 se não houver número
+    """
+    try:
+        return float(text.translate(_DIGIT_KEEP))
+    except ValueError:
+        # Células com texto extra (ex: "123.45 USDT") usam a extração por regex
+        match = _RE_NUM_COMMA.search(text)
+        try:
+            return float(match.group(1).replace(',', '')) if match else 0.0
+        except ValueError:
+            return 0.0
 
 class BlockchainExplorerClient:
     """
@@ -18,6 +148,11 @@ class BlockchainExplorerClient:
     Usa web scraping para obter dados sem necessidade de API key.
     """
     
+    __slots__ = (
+        "explorers", "user_agent", "cache_ttl", "cache", "disk_cache_dir",
+        "disk_cache_ttl", "_disk_storage", "_tree_cache", "_inflight", "_client"
+    )
+    
     def __init__(self):
         """Inicializa o cliente de explorador de blockchain."""
         self.explorers = {
@@ -29,8 +164,50 @@ class BlockchainExplorerClient:
             "avalanche": "https://snowtrace.io"
         }
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        self.cache = {}
         self.cache_ttl = 300  # 5 minutos
+        # Páginas baixadas recentemente, com limite de tamanho e expiração
+        self.cache: TTLCache = TTLCache(maxsize=2048, ttl=self.cache_ttl)
+        # Cache em disco (L2), que sobrevive a reinícios do processo
+        self.disk_cache_dir = os.getenv("EXPLORER_CACHE_DIR", "/tmp/bex_cache")
+        # Mesmo prazo do cache em memória: o disco não deve servir páginas mais antigas
+        self.disk_cache_ttl = int(os.getenv("EXPLORER_CACHE_TTL", str(self.cache_ttl)))
+        self._disk_storage: Optional[hishel.AsyncFileStorage] = None
+        # Árvores lxml já construídas a partir dessas páginas
+        self._tree_cache: TTLCache = TTLCache(maxsize=512, ttl=self.cache_ttl)
+        
+        # Downloads em andamento, indexados pela URL
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Cliente HTTP de longa duração, criado no primeiro download
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Obtém o cliente HTTP compartilhado, criando-o na primeira chamada.
+        
+        As respostas também são guardadas em disco pelo hishel, de modo que
+        páginas baixadas antes de um reinício continuam disponíveis.
+        
+        Returns:
+            httpx.AsyncClient: Cliente com HTTP/2, pool de conexões e cache em disco
+        """
+        if self._client is None:
+            self._disk_storage = hishel.AsyncFileStorage(
+                base_path=self.disk_cache_dir,
+                ttl=self.disk_cache_ttl
+            )
+            self._client = hishel.AsyncCacheClient(
+                storage=self._disk_storage,
+                # Os exploradores não enviam cabeçalhos de cache úteis; o TTL acima decide a validade.
+                # Avisos de limite chegam com status 200 e seriam guardados; todo método
+                # público os verifica com _is_rate_limited, que os remove também do disco.
+                controller=hishel.Controller(force_cache=True, key_generator=_disk_cache_key),
+                timeout=30.0,
+                http2=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                headers={"User-Agent": self.user_agent},
+                follow_redirects=True
+            )
+        return self._client
         
     def _is_valid_address(self, address: str) -> bool:
         """
@@ -42,43 +219,127 @@ class BlockchainExplorerClient:
         Returns:
             True se o endereço for válido.
         """
-        # Verificação básica para endereços ETH/EVM (42 caracteres começando com 0x)
-        return bool(address and len(address) == 42 and address.startswith("0x"))
+        # Endereços ETH/EVM: 42 caracteres, prefixo 0x e dígitos hexadecimais
+        return bool(address and _ADDR_RE.fullmatch(address))
+        
+    async def _fetch_page(self, url: str) -> bytes:
+        """
+        Obtém uma página web, usando o cache e compartilhando downloads em andamento.
+        
+        Chamadas simultâneas para a mesma URL aguardam o mesmo download.
+        
+        Args:
+            url: URL para download
+            
+        Returns:
+            Conteúdo HTML da página, em bytes
+        """
+        # Verificar cache
+        data = self.cache.get(url)
+        if data is not None:
+            logger.debug(f"Usando dados em cache para {url}")
+            return data
+        
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download_page(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # shield: o cancelamento de um chamador não interrompe o download dos demais
+        return await asyncio.shield(task)
+        
+    async def _fetch_tree(self, url: str, offload: bool = False) -> Any:
+        """
+        Obtém a árvore lxml de uma página, reaproveitando árvores já construídas.
+        
+        Args:
+            url: URL da página
+            offload: Se True, o parse é feito em uma thread (útil quando várias
+                páginas são processadas ao mesmo tempo)
+            
+        Returns:
+            Elemento raiz da página (somente leitura)
+        """
+        tree = self._tree_cache.get(url)
+        if tree is None:
+            content = await self._fetch_page(url)
+            tree = await self._parse_tree(content) if offload else lxml_html.fromstring(content)
+            self._tree_cache[url] = tree
+        return tree
+        
+    async def _parse_tree(self, content: bytes) -> Any:
+        """
+        Constrói a árvore lxml em uma thread; o libxml2 libera o GIL durante o parse.
+        
+        Args:
+            content: Conteúdo HTML da página
+            
+        Returns:
+            Elemento raiz da página
+        """
+        return await asyncio.to_thread(lxml_html.fromstring, content)
+        
+    async def _is_rate_limited(self, tree: Any, url: str) -> bool:
+        """
+        Verifica se a página é o aviso de limite de requisições do explorador.
+        
+        Nesse caso a página é removida dos caches (memória e disco) para que a
+        próxima consulta tente de novo.
+        
+        Args:
+            tree: Árvore lxml da página
+            url: URL da página
+            
+        Returns:
+            True se a requisição foi limitada pelo explorador
+        """
+        if not _XP_RATE_LIMITED(tree):
+            return False
+        logger.warning(f"Limite de requisições atingido no explorador: {url}")
+        self.cache.pop(url, None)
+        self._tree_cache.pop(url, None)
+        if self._disk_storage is not None:
+            await self._disk_storage.remove(_url_cache_key(url))
+        return True
+        
+    async def _prefetch_trees(self, urls: List[str]) -> None:
+        """
+        Baixa e processa várias páginas em paralelo, preenchendo o cache de árvores.
+        
+        Erros são ignorados aqui; os métodos públicos os reportam ao consultar a página.
+        
+        Args:
+            urls: URLs das páginas
+        """
+        await asyncio.gather(*(self._fetch_tree(url, offload=True) for url in urls), return_exceptions=True)
         
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((httpx.HTTPError, asyncio.TimeoutError))
     )
-    async def _fetch_page(self, url: str) -> str:
+    async def _download_page(self, url: str) -> bytes:
         """
-        Faz o download de uma página web.
+        Faz o download de uma página web e a guarda no cache.
         
         Args:
             url: URL para download
             
         Returns:
-            Conteúdo HTML da página
+            Conteúdo HTML da página, em bytes
         """
         logger.debug(f"Fazendo download de {url}")
         
-        # Verificar cache
-        if url in self.cache:
-            data, timestamp = self.cache[url]
-            if datetime.now() - timestamp < timedelta(seconds=self.cache_ttl):
-                logger.debug(f"Usando dados em cache para {url}")
-                return data
-                
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                headers = {"User-Agent": self.user_agent}
-                response = await client.get(url, headers=headers, follow_redirects=True)
-                response.raise_for_status()
-                
-                # Salvar no cache
-                self.cache[url] = (response.text, datetime.now())
-                
-                return response.text
+            client = await self._get_client()
+            response = await client.get(url)
+            response.raise_for_status()
+            
+            # Salvar no cache os bytes brutos (o lxml detecta a codificação sozinho)
+            content = response.content
+            self.cache[url] = content
+            
+            return content
         except Exception as e:
             logger.error(f"Erro ao fazer download de {url}: {str(e)}")
             raise
@@ -104,25 +365,27 @@ class BlockchainExplorerClient:
             logger.error(f"Chain não suportada: {chain}")
             return {"error": f"Chain não suportada: {chain}"}
             
-        # Construir URL para o endereço
-        address_url = f"{explorer_url}/address/{address}"
+        # Construir URL para o endereço (minúsculo, para variações de checksum compartilharem o cache)
+        address_url = f"{explorer_url}/address/{address.lower()}"
         
         try:
-            # Fazer download da página
-            html_content = await self._fetch_page(address_url)
+            # Obter a árvore da página
+            tree = await self._fetch_tree(address_url)
+            if await self._is_rate_limited(tree, address_url):
+                return {"error": "rate_limited"}
             
             # Extrair informações
-            return await self._parse_address_info(html_content, address, chain)
+            return await self._parse_address_info(tree, address, chain)
         except Exception as e:
             logger.error(f"Erro ao obter informações do endereço {address}: {str(e)}")
             return {"error": f"Falha ao obter dados: {str(e)}"}
         
-    async def _parse_address_info(self, html_content: str, address: str, chain: str) -> Dict[str, Any]:
+    async def _parse_address_info(self, tree: Any, address: str, chain: str) -> Dict[str, Any]:
         """
-        Extrai informações do endereço a partir do HTML.
+        Extrai informações do endereço a partir da árvore HTML.
         
         Args:
-            html_content: HTML da página do endereço
+            tree: Árvore lxml da página do endereço
             address: Endereço consultado
             chain: Cadeia de blocos
             
@@ -130,7 +393,6 @@ class BlockchainExplorerClient:
             Informações extraídas do endereço
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
             result = {
                 "address": address,
                 "chain": chain,
@@ -138,32 +400,32 @@ class BlockchainExplorerClient:
             }
             
             # Extrair saldo em ETH/moeda nativa
-            balance_element = soup.select_one("div.card-body span.u-label")
-            if balance_element:
-                balance_text = balance_element.get_text(strip=True)
+            balance_elements = _XP_BALANCE(tree)
+            if balance_elements:
+                balance_text = _text(balance_elements[0])
                 # Extrair valor numérico usando regex
-                balance_match = re.search(r'(\d+\.?\d*)', balance_text)
+                balance_match = _RE_DECIMAL.search(balance_text)
                 result["balance"] = float(balance_match.group(1)) if balance_match else 0
                 result["currency"] = "ETH" if chain == "eth" else chain.upper()
             
-            # Verificar se é um contrato
-            is_contract = "Contract" in html_content or "Contract Address" in html_content
+            # Verificar se é um contrato (aba "Contract" presente na página)
+            is_contract = _XP_IS_CONTRACT(tree)
             result["is_contract"] = is_contract
             
             if is_contract:
                 # Tentar encontrar nome do contrato/token
-                token_name_element = soup.select_one("span.h4")
-                if token_name_element:
-                    result["token_name"] = token_name_element.get_text(strip=True)
+                token_name_elements = _XP_TOKEN_NAME(tree)
+                if token_name_elements:
+                    result["token_name"] = _text(token_name_elements[0])
                 
                 # Extrair dados do token se for um contrato ERC-20
-                result["token_data"] = await self._extract_token_data(soup)
+                result["token_data"] = await self._extract_token_data(tree)
             
             # Extrair última atividade
-            txs_element = soup.select_one("a[href*='txs']")
-            if txs_element:
-                txs_text = txs_element.get_text(strip=True)
-                txs_match = re.search(r'(\d+)', txs_text)
+            txs_elements = _XP_TXS_LINK(tree)
+            if txs_elements:
+                txs_text = _text(txs_elements[0])
+                txs_match = _RE_INT.search(txs_text)
                 result["transaction_count"] = int(txs_match.group(1)) if txs_match else 0
             
             return result
@@ -176,12 +438,12 @@ class BlockchainExplorerClient:
                 "timestamp": datetime.now().isoformat()
             }
     
-    async def _extract_token_data(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    async def _extract_token_data(self, tree: Any) -> Dict[str, Any]:
         """
-        Extrai dados de um token a partir da sopa HTML.
+        Extrai dados de um token a partir da árvore HTML.
         
         Args:
-            soup: BeautifulSoup da página do token
+            tree: Árvore lxml da página do token
             
         Returns:
             Dados do token extraídos
@@ -191,22 +453,22 @@ class BlockchainExplorerClient:
         # Extrair informações básicas do token
         try:
             # Encontrar símbolos
-            symbol_element = soup.select_one("span.text-secondary")
-            if symbol_element:
-                token_data["symbol"] = symbol_element.get_text(strip=True)
+            symbol_elements = _XP_TOKEN_SYMBOL(tree)
+            if symbol_elements:
+                token_data["symbol"] = _text(symbol_elements[0])
             
             # Encontrar decimais
-            decimals_element = soup.find(string=re.compile("Decimals"))
-            if decimals_element and decimals_element.parent:
-                decimals_text = decimals_element.parent.get_text(strip=True)
-                decimals_match = re.search(r'Decimals:\s*(\d+)', decimals_text)
+            decimals_elements = _XP_DECIMALS(tree)
+            if decimals_elements:
+                decimals_text = _text(decimals_elements[0])
+                decimals_match = _RE_DECIMALS.search(decimals_text)
                 token_data["decimals"] = int(decimals_match.group(1)) if decimals_match else 18
             
             # Encontrar supply
-            total_supply_element = soup.find(string=re.compile("Total Supply"))
-            if total_supply_element and total_supply_element.parent:
-                supply_text = total_supply_element.parent.get_text(strip=True)
-                supply_match = re.search(r'([\d,\.]+)', supply_text)
+            total_supply_elements = _XP_TOTAL_SUPPLY(tree)
+            if total_supply_elements:
+                supply_text = _text(total_supply_elements[0])
+                supply_match = _RE_NUM_COMMA.search(supply_text)
                 if supply_match:
                     # Remover vírgulas e converter para float
                     supply = supply_match.group(1).replace(',', '')
@@ -237,25 +499,29 @@ class BlockchainExplorerClient:
             logger.error(f"Chain não suportada: {chain}")
             return [{"error": f"Chain não suportada: {chain}"}]
             
-        # Construir URL para os detentores do token
-        holders_url = f"{explorer_url}/token/{token_address}#balances"
+        # Construir URL para os detentores do token. O fragmento (#balances) não é enviado
+        # ao servidor, então a URL sem ele compartilha o cache com a página de transações
+        holders_url = f"{explorer_url}/token/{token_address.lower()}"
         
         try:
-            # Fazer download da página
-            html_content = await self._fetch_page(holders_url)
+            # Obter a árvore da página
+            tree = await self._fetch_tree(holders_url)
+            if await self._is_rate_limited(tree, holders_url):
+                return [{"error": "rate_limited"}]
             
             # Extrair informações dos detentores
-            return await self._parse_token_holders(html_content, token_address, chain)
+            holders = await self._parse_token_holders(tree, token_address, chain)
+            return holders
         except Exception as e:
             logger.error(f"Erro ao obter detentores do token {token_address}: {str(e)}")
             return [{"error": f"Falha ao obter dados: {str(e)}"}]
     
-    async def _parse_token_holders(self, html_content: str, token_address: str, chain: str) -> List[Dict[str, Any]]:
+    async def _parse_token_holders(self, tree: Any, token_address: str, chain: str) -> List[Dict[str, Any]]:
         """
-        Extrai informações sobre os detentores de tokens a partir do HTML.
+        Extrai informações sobre os detentores de tokens a partir da árvore HTML.
         
         Args:
-            html_content: HTML da página de detentores
+            tree: Árvore lxml da página de detentores
             token_address: Endereço do token
             chain: Cadeia de blocos
             
@@ -263,41 +529,38 @@ class BlockchainExplorerClient:
             Lista de detentores de tokens
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
             holders = []
             
-            # Encontrar tabela de detentores
-            table = soup.select_one("table.table")
-            if not table:
-                return []
-                
-            rows = table.select("tbody tr")
-            for row in rows:
+            # Sem <tbody> (páginas de erro ou vazias) não há linhas a percorrer
+            tbody = _XP_TABLE_TBODY(tree)
+            if not tbody:
+                return holders
+            
+            # Linhas da tabela de detentores
+            for row in _XP_TBODY_ROWS(tbody[0]):
                 try:
-                    columns = row.select("td")
+                    columns = _XP_TDS(row)
                     if len(columns) >= 3:
-                        rank_text = columns[0].get_text(strip=True)
-                        address_element = columns[1].select_one("a")
-                        address = address_element.get("href").split("/")[-1] if address_element else "Unknown"
-                        address_text = address_element.get_text(strip=True) if address_element else "Unknown"
-                        quantity_text = columns[2].get_text(strip=True)
-                        percentage_text = columns[3].get_text(strip=True) if len(columns) > 3 else "0%"
+                        rank_text = _text(columns[0])
+                        # O mesmo <a> fornece o endereço (href) e o rótulo (texto)
+                        anchor = _first_anchor(columns[1])
+                        address = _href_tail(anchor)
+                        address_text = (_text(anchor) if anchor is not None else "") or "Unknown"
+                        quantity_text = _text(columns[2])
+                        percentage_text = _text(columns[3]) if len(columns) > 3 else "0%"
                         
                         # Extrair valores numéricos
                         rank = int(rank_text) if rank_text.isdigit() else 0
-                        quantity_match = re.search(r'([\d,\.]+)', quantity_text)
-                        quantity = float(quantity_match.group(1).replace(',', '')) if quantity_match else 0
-                        percentage_match = re.search(r'([\d\.]+)', percentage_text)
-                        percentage = float(percentage_match.group(1)) if percentage_match else 0
+                        quantity = _parse_number(quantity_text)
+                        percentage = _parse_number(percentage_text)
                         
-                        holder = {
+                        holders.append({
                             "rank": rank,
                             "address": address,
                             "address_label": address_text if address_text != address else None,
                             "quantity": quantity,
                             "percentage": percentage
-                        }
-                        holders.append(holder)
+                        })
                 except Exception as e:
                     logger.warning(f"Erro ao processar detentor de token: {str(e)}")
                     continue
@@ -329,26 +592,28 @@ class BlockchainExplorerClient:
             logger.error(f"Chain não suportada: {chain}")
             return [{"error": f"Chain não suportada: {chain}"}]
             
-        # Construir URL para as transações do token
-        transactions_url = f"{explorer_url}/token/{token_address}#transactions"
+        # Construir URL para as transações do token (mesma página dos detentores)
+        transactions_url = f"{explorer_url}/token/{token_address.lower()}"
         
         try:
-            # Fazer download da página
-            html_content = await self._fetch_page(transactions_url)
+            # Obter a árvore da página
+            tree = await self._fetch_tree(transactions_url)
+            if await self._is_rate_limited(tree, transactions_url):
+                return [{"error": "rate_limited"}]
             
             # Extrair informações das transações
-            transactions = await self._parse_token_transactions(html_content, token_address, chain)
+            transactions = await self._parse_token_transactions(tree, token_address, chain)
             return transactions[:limit]
         except Exception as e:
             logger.error(f"Erro ao obter transações do token {token_address}: {str(e)}")
             return [{"error": f"Falha ao obter dados: {str(e)}"}]
             
-    async def _parse_token_transactions(self, html_content: str, token_address: str, chain: str) -> List[Dict[str, Any]]:
+    async def _parse_token_transactions(self, tree: Any, token_address: str, chain: str) -> List[Dict[str, Any]]:
         """
-        Extrai informações sobre transações de tokens a partir do HTML.
+        Extrai informações sobre transações de tokens a partir da árvore HTML.
         
         Args:
-            html_content: HTML da página de transações
+            tree: Árvore lxml da página de transações
             token_address: Endereço do token
             chain: Cadeia de blocos
             
@@ -356,40 +621,29 @@ class BlockchainExplorerClient:
             Lista de transações de tokens
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
             transactions = []
             
-            # Encontrar tabela de transações
-            table = soup.select_one("table.table")
-            if not table:
-                return []
-                
-            rows = table.select("tbody tr")
-            for row in rows:
+            # Sem <tbody> (páginas de erro ou vazias) não há linhas a percorrer
+            tbody = _XP_TABLE_TBODY(tree)
+            if not tbody:
+                return transactions
+            
+            # Linhas da tabela de transações
+            for row in _XP_TBODY_ROWS(tbody[0]):
                 try:
-                    columns = row.select("td")
+                    columns = _XP_TDS(row)
                     if len(columns) >= 6:
-                        tx_hash_element = columns[0].select_one("a")
-                        tx_hash = tx_hash_element.get("href").split("/")[-1] if tx_hash_element else "Unknown"
-                        
-                        method_element = columns[1].select_one("span")
-                        method = method_element.get_text(strip=True) if method_element else "Transfer"
-                        
-                        timestamp_element = columns[2].select_one("span[title]")
-                        timestamp = timestamp_element.get("title", "") if timestamp_element else ""
-                        
-                        from_element = columns[3].select_one("a")
-                        from_address = from_element.get("href").split("/")[-1] if from_element else "Unknown"
-                        
-                        to_element = columns[5].select_one("a")
-                        to_address = to_element.get("href").split("/")[-1] if to_element else "Unknown"
+                        tx_hash = _href_tail(_first_anchor(columns[0]))
+                        method = _XP_SPAN_TEXT(columns[1]) or "Transfer"
+                        timestamp = _XP_SPAN_TITLE(columns[2])
+                        from_address = _href_tail(_first_anchor(columns[3]))
+                        to_address = _href_tail(_first_anchor(columns[5]))
                         
                         quantity_element = columns[6] if len(columns) > 6 else None
-                        quantity_text = quantity_element.get_text(strip=True) if quantity_element else "0"
-                        quantity_match = re.search(r'([\d,\.]+)', quantity_text)
-                        quantity = float(quantity_match.group(1).replace(',', '')) if quantity_match else 0
+                        quantity_text = _text(quantity_element) if quantity_element is not None else "0"
+                        quantity = _parse_number(quantity_text)
                         
-                        transaction = {
+                        transactions.append({
                             "tx_hash": tx_hash,
                             "method": method,
                             "timestamp": timestamp,
@@ -397,8 +651,7 @@ class BlockchainExplorerClient:
                             "to": to_address,
                             "quantity": quantity,
                             "token_address": token_address
-                        }
-                        transactions.append(transaction)
+                        })
                 except Exception as e:
                     logger.warning(f"Erro ao processar transação de token: {str(e)}")
                     continue
@@ -422,6 +675,61 @@ class BlockchainExplorerClient:
         # Apenas uma wrapper para o método get_address_info, já que contém as mesmas informações
         return await self.get_address_info(token_address, chain)
         
+    async def get_token_overview(self, token_address: str, chain: str = "eth", tx_limit: int = 10) -> Dict[str, Any]:
+        """
+        Obtém informações do contrato, detentores e transações de um token em paralelo.
+        
+        Args:
+            token_address: Endereço do contrato do token
+            chain: Cadeia de blocos (eth, bsc, polygon, etc.)
+            tx_limit: Número máximo de transações a retornar
+            
+        Returns:
+            Dicionário com as chaves "info", "holders" e "transactions"
+        """
+        # Construir as duas páginas (endereço e token) em paralelo, com o parse fora do loop
+        explorer_url = self.explorers.get(chain.lower())
+        if explorer_url and self._is_valid_address(token_address):
+            address = token_address.lower()
+            await self._prefetch_trees([f"{explorer_url}/address/{address}", f"{explorer_url}/token/{address}"])
+        
+        # Os três métodos já tratam seus próprios erros, então nenhum deles levanta exceção
+        info, holders, transactions = await asyncio.gather(
+            self.get_address_info(token_address, chain),
+            self.get_token_holders(token_address, chain),
+            self.get_token_transactions(token_address, tx_limit, chain)
+        )
+        return {"info": info, "holders": holders, "transactions": transactions}
+        
+    async def get_address_info_batch(self, addresses: List[str], chain: str = "eth", concurrency: int = 16) -> List[Dict[str, Any]]:
+        """
+        Obtém informações de vários endereços em paralelo, com concorrência limitada.
+        
+        Args:
+            addresses: Lista de endereços de carteiras ou contratos
+            chain: Cadeia de blocos (eth, bsc, polygon, etc.)
+            concurrency: Número máximo de consultas simultâneas ao explorador
+            
+        Returns:
+            Lista com os dados de cada endereço, na mesma ordem da entrada
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        explorer_url = self.explorers.get(chain.lower())
+        
+        async def _fetch_one(address: str) -> Dict[str, Any]:
+            async with semaphore:
+                # Parse em thread: várias páginas chegam ao mesmo tempo
+                if explorer_url and self._is_valid_address(address):
+                    await self._prefetch_trees([f"{explorer_url}/address/{address.lower()}"])
+                return await self.get_address_info(address, chain)
+        
+        results = await asyncio.gather(*(_fetch_one(address) for address in addresses), return_exceptions=True)
+        return [
+            {"address": address, "chain": chain, "error": str(result)} if isinstance(result, Exception) else result
+            for address, result in zip(addresses, results)
+        ]
+        
     async def check_connection(self) -> bool:
         """
         Verifica se a conexão com o explorador de blockchain está funcionando.
@@ -439,6 +747,14 @@ class BlockchainExplorerClient:
             logger.error(f"Erro ao verificar conexão com o explorador de blockchain: {str(e)}")
             return False
             
+    async def aclose(self) -> None:
+        """
+        Fecha o cliente HTTP e suas conexões.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            
     def _get_current_timestamp(self) -> str:
         """
         Retorna o timestamp atual formatado como string ISO.
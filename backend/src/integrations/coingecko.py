@@ -3,39 +3,256 @@ Cliente para a API do CoinGecko - uma fonte gratuita de dados de criptomoedas.
 """
 import os
 import httpx
-import json
+import hishel
+import orjson
 import asyncio
-from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
+import bisect
+import random
+import time
+import numpy as np
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Union, Tuple
+from datetime import datetime
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from cachetools import TTLCache
+
+# Gerador do jitter das novas tentativas (independente da semente global do processo)
+_jitter = random.SystemRandom()
+
+# Campos do resumo de mercado: (chave na resposta, chave na API, valor padrão)
+_MOVER_FIELDS = (
+    ("id", "id", ""),
+    ("symbol", "symbol", ""),
+    ("name", "name", ""),
+    ("image", "image", ""),
+    ("current_price", "current_price", 0),
+    ("price_change_24h", "price_change_percentage_24h", 0)
+)
+_TOP_COIN_FIELDS = _MOVER_FIELDS[:5] + (
+    ("market_cap", "market_cap", 0),
+    ("market_cap_rank", "market_cap_rank", 0),
+    ("price_change_24h", "price_change_percentage_24h", 0)
+)
+_TRENDING_FIELDS = (
+    ("id", "id", ""),
+    ("name", "name", ""),
+    ("symbol", "symbol", ""),
+    ("market_cap_rank", "market_cap_rank", 0),
+    ("score", "score", 0)
+)
+
+def _project_coin(coin: Dict[str, Any], fields: Tuple[Tuple[str, str, Any], ...]) -> Dict[str, Any]:
+    """
+    Extrai de uma moeda apenas os campos usados no resumo de mercado.
+    
+    Args:
+        coin: Dados da moeda retornados pela API
+        fields: Campos a extrair (chave na resposta, chave na API, valor padrão)
+        
+    Returns:
+        Dict[str, Any]: Moeda com os campos selecionados
+    """
+    return {key: coin.get(source, default) for key, source, default in fields}
+
+class CoinGeckoUnavailable(Exception):
+    """Endpoint falhou recentemente; a requisição não foi repetida."""
+
+class _TokenBucket:
+    """
+    Limitador de taxa assíncrono (token bucket) que permite pequenas rajadas.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            rate: Tokens repostos por segundo
+            capacity: Número máximo de tokens acumulados (tamanho da rajada)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """
+        Aguarda até que haja um token disponível e o consome.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                # O lock é mantido durante a espera para preservar a ordem de chegada
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.last = time.monotonic()
+                self.tokens = 0
+            else:
+                self.tokens -= 1
+
+class _RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte que aplica o limite de taxa e de concorrência apenas a requisições
+    que realmente vão para a rede.
+    
+    Fica abaixo do cache em disco (hishel), então respostas servidas do disco não
+    consomem tokens do limitador nem esperam pelo semáforo.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: _TokenBucket, semaphore: asyncio.Semaphore):
+        """
+        Inicializa o transporte.
+        
+        Args:
+            transport: Transporte HTTP real
+            limiter: Limitador de taxa da API
+            semaphore: Limite de requisições simultâneas
+        """
+        self._transport = transport
+        self._limiter = limiter
+        self._semaphore = semaphore
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._limiter.acquire()
+        async with self._semaphore:
+            return await self._transport.handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
 
 class CoinGeckoClient:
     """Cliente para interagir com a API pública do CoinGecko."""
     
     BASE_URL = "https://api.coingecko.com/api/v3"
     
+    MAX_CONCURRENCY = 5
+    
+    # Novas tentativas em 429/5xx transitórios e falhas de transporte (4xx como 404 não se repetem)
+    MAX_ATTEMPTS = 3
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    
+    # Falhas ficam em cache por 5 a 10 segundos para evitar tempestades de novas tentativas
+    FAILURE_TTL = 5.0
+    
+    # Campo de variação de preço da API para cada período
+    _TIMEFRAME_MAP = {
+        "1h": "price_change_percentage_1h_in_currency",
+        "24h": "price_change_percentage_24h",
+        "7d": "price_change_percentage_7d_in_currency",
+        "14d": "price_change_percentage_14d_in_currency",
+        "30d": "price_change_percentage_30d_in_currency"
+    }
+    _PRICE_CHANGE_PARAM = ",".join(_TIMEFRAME_MAP.values())
+    # Campos de coins/markets usados pelas maiores variações (o restante não vai para o cache)
+    _MARKETS_FIELDS = frozenset(
+        ["id", "symbol", "name", "image", "current_price", "market_cap", "market_cap_rank"]
+        + list(_TIMEFRAME_MAP.values())
+    )
+    
+    # Booleanos no formato esperado pela query string da API
+    _BOOL = {True: "true", False: "false"}
+    
+    # Faixas do índice de medo e ganância (limite inferior, classificação)
+    _FG_THRESHOLDS = [(0, "Medo Extremo"), (25, "Medo"), (45, "Neutro"), (55, "Ganância"), (75, "Ganância Extrema")]
+    _FG_BOUNDS = [threshold for threshold, _ in _FG_THRESHOLDS]
+    _FG_LABELS = [label for _, label in _FG_THRESHOLDS]
+    
     def __init__(self):
         """Inicializa o cliente do CoinGecko."""
         self.api_key = os.getenv("COINGECKO_API_KEY", None)  # API key é opcional para a versão gratuita
         
-        self.cache = {}
         self.cache_ttl = {
             "price": 60,  # Cache de 1 minuto para dados de preço
             "coins": 900,  # Cache de 15 minutos para lista de moedas
             "markets": 300,  # Cache de 5 minutos para dados de mercado
             "historical": 3600,  # Cache de 1 hora para dados históricos
+            "news": 300,  # Cache de 5 minutos para tendências usadas como notícias
+        }
+        # Um cache limitado por categoria, com expiração própria
+        cache_sizes = {"price": 1024, "coins": 512, "markets": 512, "historical": 2048, "news": 256}
+        self._caches: Dict[str, TTLCache] = {
+            category: TTLCache(maxsize=cache_sizes[category], ttl=ttl)
+            for category, ttl in self.cache_ttl.items()
         }
         
-        self.request_cooldown = 1.5  # Tempo de espera entre requisições (segundos) para respeitar limites da API gratuita
-        self.last_request_time = datetime.now() - timedelta(seconds=10)  # Inicializa com um valor no passado
+        # Limite da API gratuita: 30 requisições por minuto, com rajadas de até 10
+        self._limiter = _TokenBucket(rate=30 / 60, capacity=10)
+        # Máximo de requisições simultâneas em andamento
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        
+        # Cliente HTTP de longa duração, criado na primeira requisição
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_lock = asyncio.Lock()
+        
+        # Requisições em andamento, indexadas pela chave de cache
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        # Falhas recentes: chave de cache -> instante (monotônico) até o qual não repetir
+        self._failures: TTLCache = TTLCache(maxsize=1024, ttl=2 * self.FAILURE_TTL)
+        # Mapa símbolo -> ID e conjunto de IDs conhecidos, derivados de coins/list com o mesmo TTL da lista
+        self._symbol_map_cache: TTLCache = TTLCache(maxsize=2, ttl=self.cache_ttl["coins"])
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        retry=retry_if_exception_type(httpx.HTTPStatusError)
-    )
-    async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None, cache_category: str = "price") -> Dict[str, Any]:
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Obtém o cliente HTTP compartilhado, criando-o na primeira chamada.
+        
+        As respostas também ficam em um cache em disco (hishel), que sobrevive a
+        reinícios e é compartilhado entre workers da mesma máquina. A validade
+        segue os cabeçalhos Cache-Control do CoinGecko, então o disco nunca serve
+        dados mais antigos do que a API permite. O limite de taxa é aplicado abaixo
+        do cache, só para requisições que saem para a rede.
+        
+        Returns:
+            httpx.AsyncClient: Cliente com HTTP/2, pool de conexões e cache em disco
+        """
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    headers = {"accept": "application/json"}
+                    if self.api_key:
+                        headers["x-cg-pro-api-key"] = self.api_key
+                    network = _RateLimitedTransport(
+                        httpx.AsyncHTTPTransport(
+                            http2=True,
+                            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+                        ),
+                        self._limiter,
+                        self._semaphore
+                    )
+                    self._client = httpx.AsyncClient(
+                        transport=hishel.AsyncCacheTransport(
+                            transport=network,
+                            storage=hishel.AsyncFileStorage(
+                                base_path=os.getenv("COINGECKO_CACHE_DIR", "/tmp/coingecko_cache"),
+                                ttl=self.cache_ttl["historical"]
+                            )
+                        ),
+                        base_url=self.BASE_URL,
+                        timeout=httpx.Timeout(30.0, connect=5.0),
+                        headers=headers
+                    )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """
+        Fecha o cliente HTTP e suas conexões.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self) -> "CoinGeckoClient":
+        """Permite usar o cliente com "async with", fechando as conexões ao sair."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
+    async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None, cache_category: str = "price",
+                            fields: Optional[frozenset] = None) -> Dict[str, Any]:
         """
         Faz uma requisição para a API do CoinGecko respeitando limites de requisição.
         
@@ -43,60 +260,142 @@ class CoinGeckoClient:
             endpoint: Caminho do endpoint da API.
             params: Parâmetros da query (opcional).
             cache_category: Categoria para determinar TTL do cache.
+            fields: Para respostas em lista, campos mantidos em cada item antes de
+                guardar no cache (opcional; por padrão a resposta inteira).
             
         Returns:
             Resposta da API em formato JSON.
         """
-        url = f"{self.BASE_URL}/{endpoint}"
-        
-        # Preparar parâmetros
+        # Preparar parâmetros (a API key vai no cabeçalho do cliente)
         request_params = params.copy() if params else {}
-        if self.api_key:
-            request_params["x_cg_pro_api_key"] = self.api_key
-        
-        # Verificar se temos dados em cache
-        cache_key = f"{endpoint}:{json.dumps(request_params)}"
-        if cache_key in self.cache:
-            # Verificar se o cache ainda é válido
-            cached_data, timestamp = self.cache[cache_key]
-            ttl = self.cache_ttl.get(cache_category, 300)  # Default 5 minutos
-            if datetime.now() - timestamp < timedelta(seconds=ttl):
-                return cached_data
-        
-        # Implementar cooldown entre requisições para API gratuita
-        time_since_last_request = (datetime.now() - self.last_request_time).total_seconds()
-        if time_since_last_request < self.request_cooldown:
-            cooldown_time = self.request_cooldown - time_since_last_request
-            if cooldown_time > 0:
-                await asyncio.sleep(cooldown_time)
         
+        # Verificar se temos dados em cache (categorias desconhecidas usam o TTL de mercado, 5 minutos)
+        cache = self._caches.get(cache_category)
+        if cache is None:
+            cache = self._caches["markets"]
+        cache_key = (endpoint, tuple(sorted(request_params.items())), fields)
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+        
+        # Endpoint falhou há pouco: não gastar outra requisição do limite
+        retry_at = self._failures.get(cache_key)
+        if retry_at is not None and time.monotonic() < retry_at:
+            raise CoinGeckoUnavailable(f"{endpoint} indisponível (falha recente)")
+        
+        # Chamadas simultâneas para a mesma chave aguardam a mesma requisição
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(endpoint, request_params, cache, cache_key, fields))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        # shield: o cancelamento de um chamador não interrompe a requisição dos demais
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_cache(self, endpoint: str, request_params: Dict[str, Any], cache: TTLCache, cache_key: Tuple,
+                               fields: Optional[frozenset] = None) -> Any:
+        """
+        Faz a requisição e guarda o resultado no cache.
+        
+        Args:
+            endpoint: Caminho do endpoint da API.
+            request_params: Parâmetros da query.
+            cache: Cache da categoria da requisição.
+            cache_key: Chave do resultado no cache.
+            fields: Campos mantidos em cada item de uma resposta em lista (opcional).
+            
+        Returns:
+            Resposta da API em formato JSON.
+        """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    url,
-                    params=request_params
-                )
-                
-                # Atualizar timestamp da última requisição
-                self.last_request_time = datetime.now()
-                
-                # Verificar se houve erro
-                response.raise_for_status()
-                
-                # Armazenar resultado no cache
-                result = response.json()
-                self.cache[cache_key] = (result, datetime.now())
-                
-                return result
-                
+            result = await self._request_with_retry(endpoint, request_params)
+            if fields is not None and isinstance(result, list):
+                result = [{key: value for key, value in item.items() if key in fields} for item in result]
+            
+            # Armazenar resultado no cache
+            cache[cache_key] = result
+            
+            return result
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"Erro HTTP ao chamar a API do CoinGecko: {e.response.status_code} - {e.response.text}")
+            logger.error(f"Erro HTTP ao chamar a API do CoinGecko: {e.response.status_code} em {endpoint}")
+            # O corpo só é decodificado (e truncado) quando o nível DEBUG está ativo
+            logger.opt(lazy=True).debug("Resposta do CoinGecko: {}", lambda: e.response.text[:512])
+            self._remember_failure(cache_key)
             raise
             
         except Exception as e:
             logger.error(f"Erro ao chamar a API do CoinGecko: {str(e)}")
+            self._remember_failure(cache_key)
             raise
     
+    def _remember_failure(self, cache_key: Tuple) -> None:
+        """
+        Registra a falha de uma requisição por alguns segundos (com jitter).
+        
+        Args:
+            cache_key: Chave de cache da requisição que falhou.
+        """
+        self._failures[cache_key] = time.monotonic() + self.FAILURE_TTL + _jitter.uniform(0, self.FAILURE_TTL)
+    
+    async def _request_with_retry(self, endpoint: str, request_params: Dict[str, Any]) -> Any:
+        """
+        Executa a requisição HTTP, repetindo em caso de 429, erro 5xx transitório
+        ou falha de transporte (conexão, timeout).
+        
+        Args:
+            endpoint: Caminho do endpoint da API.
+            request_params: Parâmetros da query.
+            
+        Returns:
+            Resposta da API em formato JSON.
+        """
+        for attempt in range(self.MAX_ATTEMPTS):
+            # O limite de requisições da API gratuita é aplicado pelo transporte, só em acessos à rede
+            client = await self._get_client()
+            try:
+                response = await client.get(endpoint, params=request_params)
+            except httpx.TransportError as e:
+                if attempt == self.MAX_ATTEMPTS - 1:
+                    raise
+                delay = self._retry_delay(None, attempt)
+                logger.warning(f"Falha de conexão com CoinGecko em {endpoint} ({type(e).__name__}); nova tentativa em {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            status = response.status_code
+            if status in self.RETRY_STATUSES and attempt < self.MAX_ATTEMPTS - 1:
+                delay = self._retry_delay(response, attempt)
+                logger.warning(f"CoinGecko respondeu {status} para {endpoint}; nova tentativa em {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            # Verificar se houve erro
+            response.raise_for_status()
+            return orjson.loads(response.content)
+    
+    def _retry_delay(self, response: Optional[httpx.Response], attempt: int) -> float:
+        """
+        Calcula a espera antes da próxima tentativa.
+        
+        Usa o cabeçalho Retry-After quando presente; caso contrário, backoff
+        exponencial com "full jitter", para que clientes não repitam em sincronia.
+        
+        Args:
+            response: Resposta que falhou (None em falhas de transporte).
+            attempt: Número da tentativa (começando em 0).
+            
+        Returns:
+            Tempo de espera em segundos.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), self.RETRY_MAX_DELAY)
+            except ValueError:
+                pass  # Formato de data HTTP: usar o backoff abaixo
+        return _jitter.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt))
+    
     async def ping(self) -> bool:
         """
         Verifica se a API do CoinGecko está respondendo.
@@ -106,7 +405,11 @@ class CoinGeckoClient:
         """
         try:
             response = await self._make_request("ping")
-            return "gecko_says" in response
+            available = "gecko_says" in response
+            if available:
+                # API respondendo novamente: liberar os endpoints marcados como indisponíveis
+                self._failures.clear()
+            return available
         except Exception as e:
             logger.error(f"Erro ao fazer ping na API do CoinGecko: {str(e)}")
             return False
@@ -124,6 +427,70 @@ class CoinGeckoClient:
             logger.error(f"Erro ao obter lista de moedas: {str(e)}")
             return []
     
+    async def _get_symbol_to_id(self) -> Dict[str, Optional[str]]:
+        """
+        Obtém o mapa de símbolo (minúsculo) para ID do CoinGecko, montado a partir de coins/list.
+        
+        Símbolos compartilhados por mais de uma moeda mapeiam para None, para que o
+        chamador recorra à busca (ordenada por relevância) em vez de escolher ao acaso.
+        
+        Returns:
+            Dicionário símbolo -> ID (ou None se o símbolo for ambíguo)
+        """
+        symbol_map = self._symbol_map_cache.get("symbols")
+        if symbol_map is None:
+            await self._load_coin_index()
+            symbol_map = self._symbol_map_cache.get("symbols", {})
+        return symbol_map
+    
+    async def _get_known_ids(self) -> frozenset:
+        """
+        Obtém o conjunto de IDs do CoinGecko, montado a partir de coins/list.
+        
+        Returns:
+            Conjunto de IDs conhecidos (vazio se a lista de moedas falhar)
+        """
+        known_ids = self._symbol_map_cache.get("ids")
+        if known_ids is None:
+            await self._load_coin_index()
+            known_ids = self._symbol_map_cache.get("ids", frozenset())
+        return known_ids
+    
+    async def _load_coin_index(self) -> None:
+        """
+        Monta o mapa símbolo -> ID e o conjunto de IDs numa única passada por coins/list.
+        """
+        symbol_map: Dict[str, Optional[str]] = {}
+        known_ids = set()
+        for coin in await self.get_coins_list():
+            coin_id = coin.get("id")
+            symbol = coin.get("symbol", "").lower()
+            # Segunda ocorrência do símbolo: marcar como ambíguo
+            symbol_map[symbol] = None if symbol in symbol_map else coin_id
+            known_ids.add(coin_id)
+        # Não guardar o índice vazio de uma falha na lista de moedas
+        if symbol_map:
+            self._symbol_map_cache["symbols"] = symbol_map
+            self._symbol_map_cache["ids"] = frozenset(known_ids)
+    
+    async def _resolve_symbol(self, symbol: str) -> Optional[str]:
+        """
+        Converte um símbolo para o ID do CoinGecko, usando a busca só quando necessário.
+        
+        Args:
+            symbol: Símbolo do token (ex: BTC)
+            
+        Returns:
+            ID da moeda, ou None se não encontrada
+        """
+        coin_id = (await self._get_symbol_to_id()).get(symbol.lower())
+        if coin_id:
+            return coin_id
+        
+        # Símbolo desconhecido ou ambíguo: pegar o primeiro resultado da busca
+        coins = await self.search_coins(symbol)
+        return coins[0]["id"] if coins else None
+    
     async def search_coins(self, query: str) -> List[Dict[str, Any]]:
         """
         Busca moedas pelo nome ou símbolo.
@@ -159,11 +526,11 @@ class CoinGeckoClient:
             Dados detalhados da moeda.
         """
         params = {
-            "localization": str(localization).lower(),
-            "tickers": str(tickers).lower(),
-            "market_data": str(market_data).lower(),
-            "community_data": str(community_data).lower(),
-            "developer_data": str(developer_data).lower()
+            "localization": self._BOOL[bool(localization)],
+            "tickers": self._BOOL[bool(tickers)],
+            "market_data": self._BOOL[bool(market_data)],
+            "community_data": self._BOOL[bool(community_data)],
+            "developer_data": self._BOOL[bool(developer_data)]
         }
         
         try:
@@ -183,6 +550,10 @@ class CoinGeckoClient:
         Returns:
             Dicionário com preços atuais.
         """
+        # Nada a consultar: evitar uma requisição que só retornaria {}
+        if not coin_ids or not vs_currencies:
+            return {}
+            
         if isinstance(coin_ids, list):
             ids = ",".join(coin_ids)
         else:
@@ -234,7 +605,8 @@ class CoinGeckoClient:
     
     async def get_markets(self, vs_currency: str = "usd", ids: Optional[List[str]] = None, 
                         category: Optional[str] = None, order: str = "market_cap_desc", 
-                        per_page: int = 100, page: int = 1, price_change_percentage: Optional[str] = None) -> List[Dict[str, Any]]:
+                        per_page: int = 100, page: int = 1, price_change_percentage: Optional[str] = None,
+                        fields: Optional[frozenset] = None) -> List[Dict[str, Any]]:
         """
         Obtém dados de mercado para moedas listadas e filtragem.
         
@@ -246,10 +618,15 @@ class CoinGeckoClient:
             per_page: Número de resultados por página.
             page: Número da página.
             price_change_percentage: Períodos para calcular mudança de preço (1h,24h,7d,14d,30d,200d,1y).
+            fields: Campos mantidos em cada moeda (opcional; por padrão todos).
             
         Returns:
             Lista de dados de mercado para moedas.
         """
+        # Lista de IDs vazia (diferente de None) não seleciona nenhuma moeda
+        if ids is not None and not ids:
+            return []
+            
         params = {
             "vs_currency": vs_currency,
             "order": order,
@@ -267,7 +644,7 @@ class CoinGeckoClient:
             params["price_change_percentage"] = price_change_percentage
             
         try:
-            return await self._make_request("coins/markets", params, cache_category="markets")
+            return await self._make_request("coins/markets", params, cache_category="markets", fields=fields)
         except Exception as e:
             logger.error(f"Erro ao obter dados de mercado: {str(e)}")
             return []
@@ -351,107 +728,66 @@ class CoinGeckoClient:
         """
         try:
             # Mapear timeframe para o campo correto da API
-            timeframe_map = {
-                "1h": "price_change_percentage_1h_in_currency",
-                "24h": "price_change_percentage_24h",
-                "7d": "price_change_percentage_7d_in_currency",
-                "14d": "price_change_percentage_14d_in_currency",
-                "30d": "price_change_percentage_30d_in_currency"
-            }
-            
-            price_change_field = timeframe_map.get(timeframe, "price_change_percentage_24h")
-            price_change_param = ",".join([field for field in timeframe_map.values()])
+            price_change_field = self._TIMEFRAME_MAP.get(timeframe, "price_change_percentage_24h")
             
             # Obter dados de mercado para as 250 principais moedas
             markets = await self.get_markets(
                 vs_currency=vs_currency, 
                 per_page=250, 
                 page=1, 
-                price_change_percentage=price_change_param
+                price_change_percentage=self._PRICE_CHANGE_PARAM,
+                fields=self._MARKETS_FIELDS
             )
             
             # Filtrar moedas com dados válidos
-            valid_coins = [coin for coin in markets if price_change_field in coin and coin[price_change_field] is not None]
+            valid_coins = [coin for coin in markets if coin.get(price_change_field) is not None]
             
-            # Ordenar por variação de preço
-            valid_coins.sort(key=lambda x: x[price_change_field], reverse=True)
+            if not valid_coins or limit <= 0:
+                return {"gainers": [], "losers": []}
             
-            # Selecionar top gainers e top losers
-            gainers = valid_coins[:limit]
-            losers = valid_coins[-limit:]
-            losers.reverse()  # Ordenar dos maiores perdedores para os menores
+            # Selecionar top gainers e top losers com argpartition sobre o vetor de variações,
+            # ordenando apenas os `limit` selecionados (losers vão dos maiores perdedores para os menores)
+            changes = np.fromiter(map(itemgetter(price_change_field), valid_coins), dtype=np.float64, count=len(valid_coins))
+            k = min(limit, len(changes))
+            top = np.argpartition(-changes, k - 1)[:k]
+            bottom = np.argpartition(changes, k - 1)[:k]
+            top = top[np.argsort(-changes[top], kind="stable")]
+            bottom = bottom[np.argsort(changes[bottom], kind="stable")]
             
             return {
-                "gainers": gainers,
-                "losers": losers
+                "gainers": [valid_coins[i] for i in top],
+                "losers": [valid_coins[i] for i in bottom]
             }
             
         except Exception as e:
             logger.error(f"Erro ao obter top gainers e losers: {str(e)}")
             return {"gainers": [], "losers": []}
     
-    async def get_fear_greed_index(self) -> Dict[str, Any]:
+    async def get_fear_greed_index(self, global_data: Optional[Dict[str, Any]] = None,
+                                   trending_coins: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Obtém uma estimativa do índice de medo e ganância do mercado baseado em métricas CoinGecko.
         
+        Args:
+            global_data: Dados globais já obtidos (opcional; buscados se ausentes).
+            trending_coins: Moedas em tendência já obtidas (opcional; buscadas se ausentes).
+            
         Returns:
             Dicionário com valor do índice e classificação.
         """
         try:
-            # Obter dados globais
-            global_data = await self.get_global_data()
-            
-            # Verificar se obtivemos dados válidos
-            if not global_data:
-                return {"value": 50, "classification": "Neutro", "error": "Dados globais não disponíveis"}
-                
-            # Fatores para calcular o índice
-            factors = {}
-            
-            # Volatilidade (baseada na dominância do BTC)
-            btc_dominance = global_data.get("market_cap_percentage", {}).get("btc", 50)
-            factors["btc_dominance"] = btc_dominance
-            
-            # Volume de mercado
-            market_cap_change = global_data.get("market_cap_change_percentage_24h_usd", 0)
-            factors["market_cap_change"] = market_cap_change
-            
-            # Tendências de busca
-            trending_coins = await self.get_trending_coins()
-            trending_factor = min(len(trending_coins) * 5, 100) if trending_coins else 50
-            factors["trending_factor"] = trending_factor
-            
-            # Calcular índice baseado nos fatores (algoritmo simplificado)
-            # Alta dominância do BTC geralmente indica medo (exceto quando BTC está subindo muito)
-            btc_dominance_factor = 100 - btc_dominance if market_cap_change > 0 else btc_dominance
-            
-            # Índice final (média ponderada dos fatores)
-            fear_greed_value = (
-                btc_dominance_factor * 0.25 +
-                (market_cap_change + 100) / 2 * 0.5 +  # Converter range (-100 a 100) para (0 a 100)
-                trending_factor * 0.25
-            )
+            # Obter dados globais e tendências de busca (em paralelo quando faltam ambos)
+            if global_data is None and trending_coins is None:
+                global_data, trending_coins = await asyncio.gather(
+                    self.get_global_data(),
+                    self.get_trending_coins()
+                )
+            elif global_data is None:
+                global_data = await self.get_global_data()
+            elif trending_coins is None:
+                trending_coins = await self.get_trending_coins()
             
-            # Garantir que está no intervalo 0-100
-            fear_greed_value = max(0, min(100, fear_greed_value))
-            
-            # Classificação
-            classification = "Medo Extremo"
-            if fear_greed_value >= 25:
-                classification = "Medo"
-            if fear_greed_value >= 45:
-                classification = "Neutro"
-            if fear_greed_value >= 55:
-                classification = "Ganância"
-            if fear_greed_value >= 75:
-                classification = "Ganância Extrema"
-                
-            return {
-                "value": round(fear_greed_value),
-                "classification": classification,
-                "timestamp": datetime.now().isoformat(),
-                "factors": factors
-            }
+            return self._compute_fear_greed(global_data, trending_coins)
             
         except Exception as e:
             logger.error(f"Erro ao calcular índice de medo e ganância: {str(e)}")
@@ -461,6 +797,60 @@ class CoinGeckoClient:
                 "error": str(e)
             }
     
+    def _compute_fear_greed(self, global_data: Dict[str, Any], trending_coins: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Calcula o índice de medo e ganância a partir de dados já obtidos (sem I/O).
+        
+        Args:
+            global_data: Dados globais do mercado.
+            trending_coins: Moedas em tendência.
+            
+        Returns:
+            Dicionário com valor do índice e classificação.
+        """
+        # Verificar se obtivemos dados válidos
+        if not global_data:
+            return {"value": 50, "classification": "Neutro", "error": "Dados globais não disponíveis"}
+            
+        # Fatores para calcular o índice
+        factors = {}
+        
+        # Volatilidade (baseada na dominância do BTC)
+        btc_dominance = global_data.get("market_cap_percentage", {}).get("btc", 50)
+        factors["btc_dominance"] = btc_dominance
+        
+        # Volume de mercado
+        market_cap_change = global_data.get("market_cap_change_percentage_24h_usd", 0)
+        factors["market_cap_change"] = market_cap_change
+        
+        # Tendências de busca
+        trending_factor = min(len(trending_coins) * 5, 100) if trending_coins else 50
+        factors["trending_factor"] = trending_factor
+        
+        # Calcular índice baseado nos fatores (algoritmo simplificado)
+        # Alta dominância do BTC geralmente indica medo (exceto quando BTC está subindo muito)
+        btc_dominance_factor = 100 - btc_dominance if market_cap_change > 0 else btc_dominance
+        
+        # Índice final (média ponderada dos fatores)
+        fear_greed_value = (
+            btc_dominance_factor * 0.25 +
+            (market_cap_change + 100) / 2 * 0.5 +  # Converter range (-100 a 100) para (0 a 100)
+            trending_factor * 0.25
+        )
+        
+        # Garantir que está no intervalo 0-100
+        fear_greed_value = max(0, min(100, fear_greed_value))
+        
+        # Classificação: faixa cujo limite inferior é o maior que não excede o valor
+        classification = self._FG_LABELS[bisect.bisect_right(self._FG_BOUNDS, fear_greed_value) - 1]
+            
+        return {
+            "value": round(fear_greed_value),
+            "classification": classification,
+            "timestamp": datetime.now().isoformat(),
+            "factors": factors
+        }
+    
     async def get_market_summary(self, vs_currency: str = "usd") -> Dict[str, Any]:
         """
         Obtém um resumo geral do mercado de criptomoedas.
@@ -472,25 +862,33 @@ class CoinGeckoClient:
             Dicionário com resumo do mercado.
         """
         try:
-            # Obter dados globais
-            global_data = await self.get_global_data()
-            
-            # Obter dados de DeFi
-            defi_data = await self.get_global_defi_data()
-            
-            # Obter top moedas
-            top_coins = await self.get_markets(vs_currency=vs_currency, per_page=10, page=1)
-            
-            # Calcular índice de medo e ganância
-            fear_greed = await self.get_fear_greed_index()
-            
-            # Obter top gainers e losers
-            top_movers = await self.get_top_gainers_losers(vs_currency=vs_currency)
+            # Dados globais, DeFi, top moedas, maiores variações e tendências
+            # são independentes: buscar em paralelo
+            global_data, defi_data, top_coins, top_movers, trending = await asyncio.gather(
+                self.get_global_data(),
+                self.get_global_defi_data(),
+                self.get_markets(vs_currency=vs_currency, per_page=10, page=1),
+                self.get_top_gainers_losers(vs_currency=vs_currency),
+                self.get_trending_coins(),
+                return_exceptions=True
+            )
             
-            # Obter tendências
-            trending = await self.get_trending_coins()
+            # Substituir falhas inesperadas por valores vazios
+            if isinstance(global_data, Exception):
+                global_data = {}
+            if isinstance(defi_data, Exception):
+                defi_data = {}
+            if isinstance(top_coins, Exception):
+                top_coins = []
+            if isinstance(top_movers, Exception):
+                top_movers = {"gainers": [], "losers": []}
+            if isinstance(trending, Exception):
+                trending = []
             trending_coins = [item["item"] for item in trending] if trending else []
             
+            # Índice de medo e ganância calculado sobre o mesmo retrato dos dados
+            fear_greed = self._compute_fear_greed(global_data, trending)
+            
             # Consolidar resumo do mercado
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -510,47 +908,10 @@ class CoinGeckoClient:
                     "defi_dominance": defi_data.get("defi_dominance", 0),
                     "top_coins_defi": defi_data.get("top_coins_defi", [])
                 },
-                "top_coins": [
-                    {
-                        "id": coin.get("id", ""),
-                        "symbol": coin.get("symbol", ""),
-                        "name": coin.get("name", ""),
-                        "image": coin.get("image", ""),
-                        "current_price": coin.get("current_price", 0),
-                        "market_cap": coin.get("market_cap", 0),
-                        "market_cap_rank": coin.get("market_cap_rank", 0),
-                        "price_change_24h": coin.get("price_change_percentage_24h", 0)
-                    } for coin in top_coins
-                ],
-                "top_gainers": [
-                    {
-                        "id": coin.get("id", ""),
-                        "symbol": coin.get("symbol", ""),
-                        "name": coin.get("name", ""),
-                        "image": coin.get("image", ""),
-                        "current_price": coin.get("current_price", 0),
-                        "price_change_24h": coin.get("price_change_percentage_24h", 0)
-                    } for coin in top_movers.get("gainers", [])
-                ],
-                "top_losers": [
-                    {
-                        "id": coin.get("id", ""),
-                        "symbol": coin.get("symbol", ""),
-                        "name": coin.get("name", ""),
-                        "image": coin.get("image", ""),
-                        "current_price": coin.get("current_price", 0),
-                        "price_change_24h": coin.get("price_change_percentage_24h", 0)
-                    } for coin in top_movers.get("losers", [])
-                ],
-                "trending": [
-                    {
-                        "id": coin.get("id", ""),
-                        "name": coin.get("name", ""),
-                        "symbol": coin.get("symbol", ""),
-                        "market_cap_rank": coin.get("market_cap_rank", 0),
-                        "score": coin.get("score", 0)
-                    } for coin in trending_coins
-                ],
+                "top_coins": [_project_coin(coin, _TOP_COIN_FIELDS) for coin in top_coins],
+                "top_gainers": [_project_coin(coin, _MOVER_FIELDS) for coin in top_movers.get("gainers", [])],
+                "top_losers": [_project_coin(coin, _MOVER_FIELDS) for coin in top_movers.get("losers", [])],
+                "trending": [_project_coin(coin, _TRENDING_FIELDS) for coin in trending_coins],
                 "fear_greed_index": fear_greed
             }
             
@@ -571,14 +932,11 @@ class CoinGeckoClient:
         """
         try:
             # Primeiro precisamos converter o símbolo para o ID do CoinGecko
-            coins = await self.search_coins(symbol)
+            coin_id = await self._resolve_symbol(symbol)
             
-            if not coins:
+            if not coin_id:
                 logger.warning(f"Token {symbol} não encontrado no CoinGecko")
                 return []
-                
-            # Pegar o primeiro resultado da busca
-            coin_id = coins[0]['id']
             
             # Obter dados históricos
             market_data = await self.get_coin_market_chart(
@@ -592,18 +950,15 @@ class CoinGeckoClient:
                 return []
                 
             # Converter para o formato esperado pelo technical_agent
-            result = []
-            for i, (timestamp, price) in enumerate(market_data.get("prices", [])):
-                # Timestamp está em milissegundos
-                dt = datetime.fromtimestamp(timestamp / 1000)
-                
-                # Pegar volumes do mesmo período
-                volume = 0
-                if i < len(market_data.get("total_volumes", [])):
-                    _, volume = market_data["total_volumes"][i]
-                
-                entry = {
-                    "timestamp": dt,
+            prices = market_data.get("prices", [])
+            volumes = [volume for _, volume in market_data.get("total_volumes", [])]
+            # Completar com zeros os períodos sem volume
+            volumes.extend([0] * (len(prices) - len(volumes)))
+            
+            # Timestamp está em milissegundos
+            return [
+                {
+                    "timestamp": datetime.fromtimestamp(timestamp / 1000),
                     "prices": price,
                     "open": price,
                     "high": price,
@@ -612,9 +967,8 @@ class CoinGeckoClient:
                     "volume": volume,
                     "total_volumes": volume
                 }
-                result.append(entry)
-                
-            return result
+                for (timestamp, price), volume in zip(prices, volumes)
+            ]
             
         except Exception as e:
             logger.error(f"Erro ao obter histórico para {symbol}: {str(e)}")
@@ -634,13 +988,9 @@ class CoinGeckoClient:
         """
         logger.info(f"Obtendo notícias para {coin_id}")
         
-        # Primeiro, buscar o ID exato no CoinGecko se for um símbolo
-        if len(coin_id) < 5:  # Provavelmente é um símbolo como BTC, ETH
-            coins_list = await self.get_coins_list()
-            for coin in coins_list:
-                if coin.get('symbol', '').lower() == coin_id.lower():
-                    coin_id = coin.get('id')
-                    break
+        # Só resolver como símbolo (ex: BTC, ETH) o que não for um ID conhecido do CoinGecko
+        if coin_id not in await self._get_known_ids():
+            coin_id = await self._resolve_symbol(coin_id) or coin_id
         
         # Buscar notícias usando a API de status do mercado (inclui notícias)
         try:
@@ -940,5 +1290,17 @@ class CoinGeckoClient:
             logger.error(f"Erro ao buscar dados de mercado para {coin_id}: {str(e)}")
             return {"error": str(e)}
 
-# Instância global do cliente
-coingecko_client = CoinGeckoClient()
+# Instância global do cliente, criada no primeiro uso
+_client_singleton: Optional[CoinGeckoClient] = None
+
+def get_coingecko_client() -> CoinGeckoClient:
+    """
+    Retorna a instância compartilhada do cliente do CoinGecko, criando-a na primeira chamada.
+    
+    Returns:
+        CoinGeckoClient: Cliente compartilhado (cache, limite de requisições e conexões únicos)
+    """
+    global _client_singleton
+    if _client_singleton is None:
+        _client_singleton = CoinGeckoClient()
+    return _client_singleton
@@ -105,6 +105,37 @@ class SupabaseClient:
             logger.error(f"Erro ao salvar análise: {str(e)}")
             return {"error": str(e), "data": None}
     
+    async def save_analyses(self, analyses: List[Dict[str, Any]]):
+        """
+        Salva várias análises de token em uma única requisição (insert em lote).
+        
+        O PostgREST exige que todas as linhas tenham as mesmas chaves.
+        
+        Args:
+            analyses: Lista de análises a serem salvas
+            
+        Returns:
+            Resposta da operação, com as linhas inseridas na mesma ordem
+        """
+        try:
+            if not self.client:
+                logger.error("Cliente Supabase não inicializado")
+                return {"error": "Cliente Supabase não inicializado", "data": None}
+            
+            # Converter objetos complexos para JSON
+            for analysis_data in analyses:
+                for key, value in analysis_data.items():
+                    if isinstance(value, (dict, list)):
+                        analysis_data[key] = json.dumps(value)
+                
+            result = await asyncio.to_thread(
+                lambda: self.client.table("token_analyses").insert(analyses).execute()
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Erro ao salvar análises em lote: {str(e)}")
+            return {"error": str(e), "data": None}
+    
     async def get_analysis(self, analysis_id: str):
         """
         Obtém uma análise específica pelo ID.
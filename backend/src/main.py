@@ -1,4 +1,6 @@
 # backend/src/main.py - Atualizado em 21/03/2025 14:25
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -31,11 +33,54 @@ except Exception as e:
 from src.utils.config import get_settings
 settings = get_settings()
 
+from src.core.agent_manager import agent_manager
+from src.agents.token_agent import TokenAgent
+from src.agents.sentiment_agent import SentimentAgent
+from src.agents.onchain_agent import OnchainAgent
+from src.integrations.anthropic import anthropic_client
+from src.integrations.blockchain_explorer import blockchain_explorer
+from src.integrations.coingecko import get_coingecko_client
+from src.db.database import db
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicializa e registra os agentes na subida da aplicação.
+    
+    Mantém a importação das rotas barata e permite que cada agente faça sua
+    inicialização assíncrona (warmup) antes da primeira requisição.
+    """
+    for agent in (TokenAgent(), SentimentAgent(), OnchainAgent()):
+        await agent.warmup()
+        agent_manager.register_agent(agent)
+    # Perfis usados pela rota de análise de token
+    for profile in (
+        ("TokenAgent",),
+        ("TokenAgent", "SentimentAgent"),
+        ("TokenAgent", "OnchainAgent"),
+        ("TokenAgent", "SentimentAgent", "OnchainAgent"),
+    ):
+        agent_manager.register_profile(profile)
+    logger.info(f"Agentes registrados: {', '.join(agent_manager.agents)}")
+    
+    # Tarefas em segundo plano (ex.: gravações no banco) mantidas vivas até concluírem
+    app.state.background_tasks = set()
+    yield
+    
+    if app.state.background_tasks:
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+    # Gravar as análises que ainda estão na fila antes de encerrar
+    await db.aclose()
+    await anthropic_client.aclose()
+    await blockchain_explorer.aclose()
+    await get_coingecko_client().aclose()
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title="DeFi Insight API",
     description="API de análise avançada de tokens cripto utilizando inteligência artificial",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Adicionar middleware para tratamento de erros
@@ -0,0 +1,53 @@
+"""
+Testes dos perfis de agentes do AgentManager.
+"""
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.core.agent_manager import AgentManager
+from src.core.base_agent import BaseAgent
+from src.agents.onchain_agent import OnchainAgent
+from src.integrations.blockchain_explorer import blockchain_explorer
+
+class EchoAgent(BaseAgent):
+    """Agente de teste que devolve o próprio nome."""
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    async def analyze(self, token_data):
+        return {"agent": self.name}
+
+    async def validate_input(self, token_data):
+        return True
+
+def test_register_profile_rejects_unknown_agent():
+    manager = AgentManager()
+    manager.register_agent(EchoAgent("TokenAgent"))
+
+    with pytest.raises(KeyError, match="OnchainAgent"):
+        manager.register_profile(("TokenAgent", "OnchainAgent"))
+
+@pytest.mark.asyncio
+async def test_run_profile_runs_every_agent():
+    manager = AgentManager()
+    manager.register_agent(EchoAgent("TokenAgent"))
+    manager.register_agent(EchoAgent("OnchainAgent"))
+    profile = manager.register_profile(("TokenAgent", "OnchainAgent"))
+
+    result = await manager.run_profile(profile, {})
+
+    assert result == {"TokenAgent": {"agent": "TokenAgent"}, "OnchainAgent": {"agent": "OnchainAgent"}}
+
+def test_onchain_agent_name_matches_routes():
+    assert OnchainAgent().name == "OnchainAgent"
+
+def test_onchain_agent_reuses_module_explorer():
+    # A instância do módulo é a que o lifespan fecha
+    assert OnchainAgent().blockchain_explorer is blockchain_explorer
@@ -0,0 +1,114 @@
+"""
+Testes do agrupamento de análises de sentimento (_BatchAggregator).
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.integrations.anthropic import AnthropicClient, _BatchAggregator
+
+def recorder(transform=lambda items: [item * 2 for item in items]):
+    """Função de lote que registra cada lote recebido."""
+    batches = []
+
+    async def process_batch(items):
+        batches.append(list(items))
+        return transform(items)
+
+    return process_batch, batches
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_form_one_batch():
+    process_batch, batches = recorder()
+    aggregator = _BatchAggregator(process_batch, max_batch_size=8, batch_wait_timeout_s=0.01)
+
+    assert await asyncio.gather(*(aggregator.submit(i) for i in range(5))) == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+    await aggregator.aclose()
+
+@pytest.mark.asyncio
+async def test_batches_respect_max_size():
+    process_batch, batches = recorder()
+    aggregator = _BatchAggregator(process_batch, max_batch_size=2, batch_wait_timeout_s=0.01)
+
+    await asyncio.gather(*(aggregator.submit(i) for i in range(5)))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    await aggregator.aclose()
+
+@pytest.mark.asyncio
+async def test_batch_error_reaches_every_caller():
+    def fail(items):
+        raise RuntimeError("falhou")
+
+    process_batch, _ = recorder(fail)
+    aggregator = _BatchAggregator(process_batch, batch_wait_timeout_s=0.01)
+
+    results = await asyncio.gather(aggregator.submit(1), aggregator.submit(2), return_exceptions=True)
+
+    assert [str(result) for result in results] == ["falhou", "falhou"]
+    await aggregator.aclose()
+
+@pytest.mark.asyncio
+async def test_short_batch_result_does_not_hang_callers():
+    process_batch, _ = recorder(lambda items: ["só o primeiro"])
+    aggregator = _BatchAggregator(process_batch, batch_wait_timeout_s=0.01)
+
+    first, second = await asyncio.wait_for(
+        asyncio.gather(aggregator.submit(1), aggregator.submit(2), return_exceptions=True), 1
+    )
+
+    assert first == "só o primeiro"
+    assert isinstance(second, RuntimeError)
+    await aggregator.aclose()
+
+@pytest.mark.asyncio
+async def test_worker_restart_keeps_pending_queue():
+    process_batch, _ = recorder()
+    aggregator = _BatchAggregator(process_batch, batch_wait_timeout_s=0.001)
+    await aggregator.submit(0)
+
+    # Simula a tarefa morta com um item ainda na fila
+    aggregator._worker.cancel()
+    await asyncio.gather(aggregator._worker, return_exceptions=True)
+    pending = asyncio.get_running_loop().create_future()
+    await aggregator._queue.put((5, pending))
+
+    assert await aggregator.submit(1) == 2
+    assert await pending == 10
+    await aggregator.aclose()
+
+@pytest.mark.asyncio
+async def test_aclose_finishes_pending_items_and_stops_worker():
+    process_batch, _ = recorder()
+    aggregator = _BatchAggregator(process_batch, batch_wait_timeout_s=0.01)
+    tasks = [asyncio.create_task(aggregator.submit(i)) for i in range(3)]
+    await asyncio.sleep(0)
+
+    await aggregator.aclose()
+
+    assert [task.result() for task in tasks] == [0, 2, 4]
+    assert aggregator._worker is None
+
+@pytest.mark.asyncio
+async def test_sentiment_batch_sends_one_request_per_distinct_text():
+    client = AnthropicClient()
+    single_calls = []
+
+    async def analyze_single(text):
+        single_calls.append(text)
+        return {"score": len(text)}
+
+    client._analyze_sentiment_single = analyze_single
+
+    results = await client._analyze_sentiment_batch(["a", "bb", "a"])
+
+    assert results == [{"score": 1}, {"score": 2}, {"score": 1}]
+    assert results[0] is not results[2]
+    assert single_calls == ["a", "bb"]
+    await client.aclose()
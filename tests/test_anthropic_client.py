@@ -0,0 +1,121 @@
+"""
+Testes do ciclo de vida e dos caches do AnthropicClient.
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.integrations.anthropic import AnthropicClient
+
+def test_client_is_usable_after_aclose_in_a_new_event_loop():
+    client = AnthropicClient()
+    client.api_key = "test"
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"content": [{"type": "tool_use", "input": {"score": 70}}]})
+
+    async def cycle():
+        # Cada ciclo equivale a um lifespan: usa o cliente e depois o fecha
+        http_client = client._get_http_client()
+        http_client._transport = httpx.MockTransport(handler)
+        result = await client._raw_messages({"model": "m"})
+        await client.aclose()
+        return http_client, result
+
+    first_pool, first = asyncio.run(cycle())
+    second_pool, second = asyncio.run(cycle())
+
+    assert first == second == {"content": [{"type": "tool_use", "input": {"score": 70}}]}
+    assert first_pool is not second_pool
+    assert first_pool.is_closed and second_pool.is_closed
+    assert client.http_client is None
+    assert len(requests) == 2
+
+def test_sentiment_batcher_survives_a_new_event_loop():
+    client = AnthropicClient()
+    client.api_key = "test"
+
+    async def analyze_single(text):
+        return {"score": len(text)}
+
+    client._analyze_sentiment_single = analyze_single
+
+    async def cycle(text):
+        result = await client.analyze_sentiment(text)
+        await client.aclose()
+        return result
+
+    assert asyncio.run(cycle("a")) == {"score": 1}
+    assert asyncio.run(cycle("bb")) == {"score": 2}
+
+def test_cached_sentiment_is_not_shared_with_callers():
+    client = AnthropicClient()
+    client.api_key = "test"
+
+    async def analyze_single(text):
+        return {"score": 70, "keywords": ["eth"]}
+
+    client._analyze_sentiment_single = analyze_single
+
+    async def run():
+        first = await client.analyze_sentiment("texto")
+        first["keywords"].append("alterado")
+        first["score"] = 0
+        second = await client.analyze_sentiment("texto")
+        await client.aclose()
+        return second
+
+    assert asyncio.run(run()) == {"score": 70, "keywords": ["eth"]}
+
+def summary_client(request_summary):
+    client = AnthropicClient()
+    client.api_key = "test"
+    client._request_summary = request_summary
+    return client
+
+def test_summary_budget_covers_the_whole_input():
+    sent = []
+
+    async def request_summary(combined_text, focus_point, max_tokens):
+        sent.append(combined_text)
+        return '{"summary": "ok", "key_points": ["ponto"]}'
+
+    client = summary_client(request_summary)
+    asyncio.run(client.summarize_discussions(["x" * 20000 for _ in range(9)]))
+
+    # Apenas a chamada de reduce fica fora do orçamento da entrada
+    map_calls = sent[:-1]
+    assert sum(len(text) for text in map_calls) <= client.SUMMARY_MAX_INPUT_TOKENS * 4 + 10
+
+def test_failed_partial_summaries_are_not_reduced():
+    sent = []
+
+    async def request_summary(combined_text, focus_point, max_tokens):
+        sent.append(combined_text)
+        if "falha" in combined_text:
+            raise ValueError("sem resposta")
+        return '{"summary": "resumo %d", "key_points": []}' % len(sent)
+
+    client = summary_client(request_summary)
+    texts = ["a", "b", "c", "falha", "e", "f", "g"]
+    result = asyncio.run(client.summarize_discussions(texts))
+
+    assert "error" not in result
+    assert "Erro" not in sent[-1]
+    assert sent[-1].count("---") == 1
+
+def test_summary_fails_when_every_partial_fails():
+    async def request_summary(combined_text, focus_point, max_tokens):
+        raise ValueError("sem resposta")
+
+    client = summary_client(request_summary)
+    result = asyncio.run(client.summarize_discussions(["a", "b", "c", "d"]))
+
+    assert "error" in result
@@ -0,0 +1,117 @@
+"""
+Testes da extração de dados das páginas dos exploradores (XPath sobre HTML salvo).
+"""
+import os
+import sys
+
+import pytest
+from lxml import html as lxml_html
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.integrations.blockchain_explorer import BlockchainExplorerClient
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TOKEN = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+ADDRESS = "0x28c6c06298d514db089934071355e5743bf21d60"
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+@pytest.fixture
+def explorer(tmp_path):
+    client = BlockchainExplorerClient()
+    client.disk_cache_dir = str(tmp_path)
+    return client
+
+@pytest.mark.asyncio
+async def test_parse_token_holders(explorer):
+    tree = lxml_html.fromstring(load("etherscan_holders.html"))
+
+    holders = await explorer._parse_token_holders(tree, TOKEN, "eth")
+
+    assert holders == [
+        {"rank": 1, "address": "0xdac17f958d2ee523a2206206994597c13d831ec7?a=0x5754284f345afc66a98fbb0a0afe71e0f007b949",
+         "address_label": "Tether: Treasury", "quantity": 1523873040.34, "percentage": 1.6068},
+        {"rank": 2, "address": "0xf977814e90da44bfa03b6295a0616a897441acec",
+         "address_label": None, "quantity": 1000000.0, "percentage": 1.0544},
+        {"rank": 3, "address": "Unknown", "address_label": None, "quantity": 42.5, "percentage": 0.0},
+    ]
+
+@pytest.mark.asyncio
+async def test_parse_token_transactions(explorer):
+    tree = lxml_html.fromstring(load("etherscan_token.html"))
+
+    transactions = await explorer._parse_token_transactions(tree, TOKEN, "eth")
+
+    assert len(transactions) == 2
+    first, second = transactions
+    assert first["tx_hash"] == "0x5c504ed432cb51138bcf09aa5e8a410dd4a1e204ef84bfed1be16dfba1b22060"
+    assert first["method"] == "Transfer"
+    assert first["timestamp"] == "2025-03-21 14:02:11"
+    assert first["from"] == ADDRESS
+    assert first["to"] == "0x1111111111111111111111111111111111111111"
+    assert first["quantity"] == 12500.25
+    assert second["method"] == "Transfer From"
+    assert second["quantity"] == 3.0
+
+@pytest.mark.asyncio
+async def test_parse_contract_page(explorer):
+    tree = lxml_html.fromstring(load("etherscan_token.html"))
+
+    info = await explorer._parse_address_info(tree, TOKEN, "eth")
+
+    assert info["is_contract"] is True
+    assert info["token_name"] == "Tether USD"
+    assert info["token_data"] == {"symbol": "USDT", "decimals": 6, "total_supply": 94839018741.5}
+
+@pytest.mark.asyncio
+async def test_parse_wallet_page(explorer):
+    tree = lxml_html.fromstring(load("etherscan_address.html"))
+
+    info = await explorer._parse_address_info(tree, ADDRESS, "eth")
+
+    assert info["is_contract"] is False
+    assert info["balance"] == 843.0197
+    assert info["currency"] == "ETH"
+    assert info["transaction_count"] == 412
+    assert "token_data" not in info
+
+@pytest.mark.asyncio
+async def test_get_token_holders_uses_cached_page(explorer):
+    url = f"{explorer.explorers['eth']}/token/{TOKEN}"
+    explorer.cache[url] = load("etherscan_holders.html")
+
+    holders = await explorer.get_token_holders(TOKEN.upper().replace("0X", "0x"), "eth")
+
+    assert [holder["rank"] for holder in holders] == [1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_rate_limited_page_is_reported_and_evicted(explorer):
+    url = f"{explorer.explorers['eth']}/token/{TOKEN}"
+    explorer.cache[url] = load("etherscan_rate_limited.html")
+
+    assert await explorer.get_token_transactions(TOKEN, chain="eth") == [{"error": "rate_limited"}]
+    assert url not in explorer.cache
+
+@pytest.mark.asyncio
+async def test_warning_banner_with_table_is_not_rate_limited(explorer):
+    tree = lxml_html.fromstring(load("etherscan_token.html"))
+
+    assert await explorer._is_rate_limited(tree, "https://etherscan.io/token/x") is False
+
+def test_disk_cache_expires_with_memory_cache(monkeypatch):
+    monkeypatch.delenv("EXPLORER_CACHE_TTL", raising=False)
+
+    assert BlockchainExplorerClient().disk_cache_ttl == BlockchainExplorerClient().cache_ttl
+
+@pytest.mark.asyncio
+async def test_rate_limited_address_page_is_reported_and_evicted(explorer):
+    url = f"{explorer.explorers['eth']}/address/{ADDRESS}"
+    explorer.cache[url] = load("etherscan_rate_limited.html")
+
+    assert await explorer.get_address_info(ADDRESS, "eth") == {"error": "rate_limited"}
+    assert url not in explorer.cache
+    assert url not in explorer._tree_cache
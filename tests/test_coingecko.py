@@ -0,0 +1,177 @@
+"""
+Testes do cliente CoinGecko (novas tentativas, cache negativo e limite de taxa).
+"""
+import asyncio
+import email.utils
+import os
+import sys
+
+import httpx
+import pytest
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.integrations.coingecko import CoinGeckoClient, CoinGeckoUnavailable
+
+@pytest.fixture
+def make_client(monkeypatch, tmp_path):
+    """Cria clientes cuja rede é um MockTransport, com cache em disco temporário."""
+    monkeypatch.setenv("COINGECKO_CACHE_DIR", str(tmp_path))
+
+    def factory(handler):
+        monkeypatch.setattr(httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler))
+        client = CoinGeckoClient()
+        client.RETRY_BASE_DELAY = 0.001
+        return client
+
+    return factory
+
+def counting(responses):
+    """Handler que devolve as respostas em sequência e conta as chamadas."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return handler, calls
+
+@pytest.mark.asyncio
+async def test_disk_cache_hit_does_not_consume_rate_limit(make_client):
+    handler, calls = counting([httpx.Response(200, json={"ok": 1}, headers={"Cache-Control": "max-age=60", "Date": email.utils.formatdate(usegmt=True)})])
+    client = make_client(handler)
+
+    assert await client._request_with_retry("ping", {}) == {"ok": 1}
+    tokens = client._limiter.tokens
+    assert await client._request_with_retry("ping", {}) == {"ok": 1}
+
+    assert len(calls) == 1
+    assert client._limiter.tokens >= tokens
+    await client.aclose()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+async def test_transient_status_is_retried(make_client, status):
+    handler, calls = counting([
+        httpx.Response(status, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"ok": 1})
+    ])
+    client = make_client(handler)
+
+    assert await client._request_with_retry("ping", {}) == {"ok": 1}
+    assert len(calls) == 2
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_not_found_is_not_retried(make_client):
+    handler, calls = counting([httpx.Response(404, json={"error": "coin not found"})])
+    client = make_client(handler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._request_with_retry("coins/nope", {})
+    assert len(calls) == 1
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_retries_stop_after_max_attempts(make_client):
+    handler, calls = counting([httpx.Response(503)])
+    client = make_client(handler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._request_with_retry("ping", {})
+    assert len(calls) == client.MAX_ATTEMPTS
+    await client.aclose()
+
+def test_retry_delay_honors_retry_after():
+    client = CoinGeckoClient()
+
+    assert client._retry_delay(httpx.Response(429, headers={"Retry-After": "7"}), 0) == 7.0
+    assert client._retry_delay(httpx.Response(429, headers={"Retry-After": "9999"}), 0) == client.RETRY_MAX_DELAY
+    assert 0 <= client._retry_delay(httpx.Response(503), 2) <= client.RETRY_BASE_DELAY * 4
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_fetch(make_client):
+    handler, calls = counting([httpx.Response(200, json={"bitcoin": {"usd": 1}})])
+    client = make_client(handler)
+
+    results = await asyncio.gather(*(client._make_request("simple/price", {"ids": "bitcoin"}) for _ in range(5)))
+
+    assert results == [{"bitcoin": {"usd": 1}}] * 5
+    assert len(calls) == 1
+    assert not client._inflight
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch(make_client):
+    handler, calls = counting([httpx.Response(200, json={"ok": 1})])
+    client = make_client(handler)
+
+    first = asyncio.create_task(client._make_request("ping"))
+    second = asyncio.create_task(client._make_request("ping"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == {"ok": 1}
+    assert first.cancelled()
+    assert len(calls) == 1
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_recent_failure_is_not_requested_again(make_client):
+    handler, calls = counting([httpx.Response(404), httpx.Response(200, json={"id": "nope"})])
+    client = make_client(handler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._make_request("coins/nope")
+    with pytest.raises(CoinGeckoUnavailable):
+        await client._make_request("coins/nope")
+    assert len(calls) == 1
+
+    # Passada a janela de falha, a requisição volta a ser feita
+    client._failures.clear()
+    assert await client._make_request("coins/nope") == {"id": "nope"}
+    assert len(calls) == 2
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_successful_ping_clears_failures(make_client):
+    handler, calls = counting([httpx.Response(200, json={"gecko_says": "(V3) To the Moon!"})])
+    client = make_client(handler)
+    client._remember_failure(("coins/nope", (), None))
+
+    assert await client.ping() is True
+    assert not client._failures
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_transport_error_is_retried(make_client):
+    handler, calls = counting([httpx.ConnectTimeout("timeout"), httpx.Response(200, json={"ok": 1})])
+    client = make_client(handler)
+
+    assert await client._request_with_retry("ping", {}) == {"ok": 1}
+    assert len(calls) == 2
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_transport_error_raises_after_max_attempts(make_client):
+    handler, calls = counting([httpx.ConnectError("down")])
+    client = make_client(handler)
+
+    with pytest.raises(httpx.ConnectError):
+        await client._request_with_retry("ping", {})
+    assert len(calls) == client.MAX_ATTEMPTS
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_non_transient_server_error_is_not_retried(make_client):
+    handler, calls = counting([httpx.Response(501)])
+    client = make_client(handler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._request_with_retry("ping", {})
+    assert len(calls) == 1
+    await client.aclose()
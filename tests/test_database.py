@@ -0,0 +1,182 @@
+"""
+Testes da fila de gravação de análises (Database.save_analysis).
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.db import database
+from src.db.database import Database
+
+class FakeSupabase:
+    """Supabase falso que registra cada insert em lote."""
+
+    def __init__(self, error=None, exc=None, bad_ids=()):
+        self.batches = []
+        self.singles = []
+        self.error = error
+        self.exc = exc
+        # Linhas rejeitadas pelo banco: derrubam o lote inteiro em que estiverem
+        self.bad_ids = set(bad_ids)
+
+    async def save_analyses(self, rows):
+        self.batches.append(rows)
+        if self.exc:
+            raise self.exc
+        if self.error or any(row.get("id") in self.bad_ids for row in rows):
+            return {"error": self.error or "linha inválida", "data": None}
+        return SimpleNamespace(error=None, data=[{"id": row.get("id")} for row in rows])
+
+    async def save_analysis(self, row):
+        self.singles.append(row)
+        result = await self.save_analyses([row])
+        self.batches.pop()
+        return result
+
+def make_db(fake):
+    db = Database()
+    db.supabase = fake
+    return db
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_are_batched():
+    fake = FakeSupabase()
+    db = make_db(fake)
+
+    results = await asyncio.gather(*(db.save_analysis({"id": i, "result": {"n": i}}) for i in range(5)))
+
+    assert results == [{"id": i} for i in range(5)]
+    assert len(fake.batches) == 1
+    assert fake.batches[0][0]["result_json"] == '{"n":0}'
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_error_result_is_a_separate_dict_per_caller():
+    db = make_db(FakeSupabase(error="falhou"))
+
+    first, second = await asyncio.gather(db.save_analysis({"id": 1}), db.save_analysis({"id": 2}))
+
+    assert first == second == {"error": "falhou"}
+    first["extra"] = True
+    assert "extra" not in second
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_exception_in_insert_resolves_every_caller():
+    db = make_db(FakeSupabase(exc=RuntimeError("sem conexão")))
+
+    results = await asyncio.gather(db.save_analysis({"id": 1}), db.save_analysis({"id": 2}))
+
+    assert results == [{"error": "sem conexão"}, {"error": "sem conexão"}]
+    assert results[0] is not results[1]
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_flusher_restart_keeps_pending_queue():
+    fake = FakeSupabase()
+    db = make_db(fake)
+    await db.save_analysis({"id": 0})
+
+    # Simula o flusher morto com uma análise ainda na fila
+    db._flusher.cancel()
+    await asyncio.gather(db._flusher, return_exceptions=True)
+    pending = asyncio.get_running_loop().create_future()
+    await db._write_queue.put(({"id": 1}, pending))
+
+    assert await db.save_analysis({"id": 2}) == {"id": 2}
+    assert await pending == {"id": 1}
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_queue_and_stops_flusher():
+    fake = FakeSupabase()
+    db = make_db(fake)
+    tasks = [asyncio.create_task(db.save_analysis({"id": i})) for i in range(3)]
+    await asyncio.sleep(0)
+
+    await db.aclose()
+
+    assert [task.result() for task in tasks] == [{"id": i} for i in range(3)]
+    assert db._flusher is None
+    assert sum(len(batch) for batch in fake.batches) == 3
+
+@pytest.mark.asyncio
+async def test_aclose_without_writes_is_noop():
+    db = make_db(FakeSupabase())
+    await db.aclose()
+    assert db._flusher is None
+
+@pytest.mark.asyncio
+async def test_rows_with_different_columns_go_in_separate_inserts():
+    fake = FakeSupabase()
+    db = make_db(fake)
+
+    results = await asyncio.gather(
+        db.save_analysis({"id": 1, "symbol": "BTC"}),
+        db.save_analysis({"id": 2, "chain": "eth"}),
+        db.save_analysis({"id": 3, "symbol": "ETH"}),
+    )
+
+    assert results == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert [sorted(row["id"] for row in batch) for batch in fake.batches] == [[1, 3], [2]]
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_single_inserts():
+    fake = FakeSupabase(bad_ids={2})
+    db = make_db(fake)
+
+    results = await asyncio.gather(*(db.save_analysis({"id": i}) for i in range(1, 4)))
+
+    assert results == [{"id": 1}, {"error": "linha inválida"}, {"id": 3}]
+    assert [row["id"] for row in fake.singles] == [1, 2, 3]
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_aclose_resets_write_queue():
+    db = make_db(FakeSupabase())
+    await db.save_analysis({"id": 1})
+
+    await db.aclose()
+
+    assert db._write_queue is None
+
+@pytest.fixture
+def thread_calls(monkeypatch):
+    """Registra as chamadas a asyncio.to_thread."""
+    calls = []
+    to_thread = asyncio.to_thread
+
+    async def spy(func, *args):
+        calls.append(func)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", spy)
+    return calls
+
+@pytest.mark.asyncio
+async def test_small_batch_is_encoded_inline(thread_calls):
+    db = make_db(FakeSupabase())
+
+    await asyncio.gather(*(db.save_analysis({"id": i, "result": {"n": i}}) for i in range(3)))
+
+    assert thread_calls == []
+    await db.aclose()
+
+@pytest.mark.asyncio
+async def test_large_batch_offloads_the_remaining_rows(monkeypatch, thread_calls):
+    monkeypatch.setattr(database, "_INLINE_ENCODE_BYTES", 10)
+    fake = FakeSupabase()
+    db = make_db(fake)
+
+    await asyncio.gather(*(db.save_analysis({"id": i, "result": {"text": "x" * 20}}) for i in range(3)))
+
+    assert len(thread_calls) == 1
+    assert [row["result_json"] for row in fake.batches[0]] == ['{"text":"%s"}' % ("x" * 20)] * 3
+    await db.aclose()
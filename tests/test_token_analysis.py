@@ -0,0 +1,127 @@
+"""
+Testes das rotas de análise de token.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Adiciona o diretório do backend ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from src.api.routes import token_analysis
+from src.api.routes.token_analysis import _inflight, _run_coalesced
+
+@pytest.mark.asyncio
+async def test_run_coalesced_shares_one_task():
+    calls = 0
+    release = asyncio.Event()
+
+    async def analysis():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"ok": calls}
+
+    waiters = [asyncio.create_task(_run_coalesced(("btc",), analysis)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [{"ok": 1}] * 3
+    assert calls == 1
+    assert ("btc",) not in _inflight
+
+@pytest.mark.asyncio
+async def test_run_coalesced_cancelled_caller_does_not_cancel_others():
+    release = asyncio.Event()
+
+    async def analysis():
+        await release.wait()
+        return {"ok": True}
+
+    first = asyncio.create_task(_run_coalesced(("eth",), analysis))
+    second = asyncio.create_task(_run_coalesced(("eth",), analysis))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == {"ok": True}
+    assert first.cancelled()
+    assert ("eth",) not in _inflight
+
+@pytest.fixture
+def client(monkeypatch):
+    """Aplicação só com o roteador de tokens, sem o lifespan principal."""
+    saved = []
+
+    async def fake_run_profile(profile_key, token_data):
+        return {"TokenAgent": {"name": "Bitcoin", "price": {"current": 1}}}
+
+    async def fake_save_analysis(analysis_data):
+        saved.append(analysis_data)
+        return {"id": analysis_data["id"]}
+
+    monkeypatch.setattr(token_analysis.agent_manager, "run_profile", fake_run_profile)
+    monkeypatch.setattr(token_analysis.db, "save_analysis", fake_save_analysis)
+
+    app = FastAPI()
+    app.include_router(token_analysis.router, prefix="/api/token")
+    test_client = TestClient(app)
+    test_client.saved = saved
+    return test_client
+
+def test_analyze_token_saves_inline_without_lifespan(client):
+    response = client.post("/api/token/", json={"symbol": "BTC", "user_id": "u1"})
+
+    assert response.status_code == 200
+    assert [row["id"] for row in client.saved] == [response.json()["analysis_id"]]
+
+def fake_analysis(monkeypatch, symbol="BTC"):
+    async def fake_get_analysis(analysis_id):
+        return {"analysis_id": analysis_id, "analysis_type": "token", "symbol": symbol, "timestamp": "2025-03-21T00:00:00"}
+
+    monkeypatch.setattr(token_analysis.db, "get_analysis", fake_get_analysis)
+
+def test_get_token_analysis_sets_content_etag(client, monkeypatch):
+    fake_analysis(monkeypatch)
+
+    response = client.get("/api/token/abc", headers={"If-None-Match": '"other"'})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"') and response.headers["ETag"] != '"abc"'
+    assert "immutable" not in response.headers["Cache-Control"]
+    assert response.json()["symbol"] == "BTC"
+
+def test_get_token_analysis_returns_304_for_matching_etag(client, monkeypatch):
+    fake_analysis(monkeypatch)
+    etag = client.get("/api/token/abc").headers["ETag"]
+
+    response = client.get("/api/token/abc", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+def test_get_token_analysis_etag_changes_with_content(client, monkeypatch):
+    fake_analysis(monkeypatch)
+    etag = client.get("/api/token/abc").headers["ETag"]
+    fake_analysis(monkeypatch, symbol="ETH")
+
+    response = client.get("/api/token/abc", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_get_token_analysis_missing_id_is_404_even_with_etag(client, monkeypatch):
+    async def missing(analysis_id):
+        return {"error": "Análise não encontrada"}
+
+    monkeypatch.setattr(token_analysis.db, "get_analysis", missing)
+
+    response = client.get("/api/token/nope", headers={"If-None-Match": '"nope"'})
+
+    assert response.status_code == 404